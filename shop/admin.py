@@ -1,6 +1,7 @@
 from django.contrib import admin, messages
-from .models import Category, Product, CartItem, Order, OfferAd
+from .models import Category, Product, CartItem, Order, OfferAd, OrderStatusEvent
 from .models import ProductComment
+from . import order_states, ratings
 
 
 
@@ -32,9 +33,31 @@ class ProductAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("name",)}
     ordering = ("-created_at",)
 
+    def save_model(self, request, obj, form, change):
+        # The rating counters are kept by F() updates (shop/ratings.py); a
+        # full-row save would write back the values loaded with the form
+        # and undo any review posted since
+        if not change:
+            return super().save_model(request, obj, form, change)
+        obj.save(update_fields=[
+            f.name for f in obj._meta.concrete_fields
+            if not f.primary_key and f.name not in ratings.COUNTER_FIELDS
+        ])
+
 
 # ================= ORDER =================
 
+class OrderStatusEventInline(admin.TabularInline):
+    model = OrderStatusEvent
+    fields = ("created_at", "transition", "from_status", "to_status", "refund_status")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = (
@@ -102,6 +125,8 @@ class OrderAdmin(admin.ModelAdmin):
         }),
     )
 
+    inlines = (OrderStatusEventInline,)
+
     actions = (
         "mark_shipped",
         "mark_completed",
@@ -110,42 +135,39 @@ class OrderAdmin(admin.ModelAdmin):
         "approve_exchange",
     )
 
+    def save_model(self, request, obj, form, change):
+        # Manual status edits go into the status history too
+        status_edited = change and {"order_status", "refund_status"} & set(form.changed_data)
+        super().save_model(request, obj, form, change)
+        if status_edited:
+            OrderStatusEvent.objects.create(
+                order=obj,
+                transition="admin_edit",
+                from_status=form.initial.get("order_status", ""),
+                to_status=obj.order_status,
+                refund_status=obj.refund_status,
+            )
+
     # ================= ACTIONS =================
+    # Each action is one set-based UPDATE (shop/order_states.py); orders
+    # not in the transition's source state are skipped.
 
     def mark_shipped(self, request, queryset):
-        count = 0
-        for order in queryset:
-            if order.order_status == "PENDING":
-                order.order_status = "SHIPPED"
-                order.save()
-                count += 1
+        count = order_states.apply(queryset, "ship")
         self.message_user(request, f"{count} order(s) marked as SHIPPED.", messages.SUCCESS)
 
     mark_shipped.short_description = "🚚 Mark as SHIPPED"
 
 
     def mark_completed(self, request, queryset):
-        count = 0
-        for order in queryset:
-            if order.order_status == "SHIPPED":
-                order.order_status = "COMPLETED"
-                order.paid = True
-                order.save()
-                count += 1
+        count = order_states.apply(queryset, "complete")
         self.message_user(request, f"{count} order(s) marked as COMPLETED.", messages.SUCCESS)
 
     mark_completed.short_description = "📦 Mark as COMPLETED (Delivered)"
 
 
     def approve_return(self, request, queryset):
-        count = 0
-        for order in queryset:
-            if order.order_status == "RETURN_REQUESTED":
-                order.order_status = "RETURNED"
-                order.refund_status = "REFUNDED"
-                order.paid = False
-                order.save()
-                count += 1
+        count = order_states.apply(queryset, "approve_return")
         self.message_user(
             request,
             f"{count} return(s) approved and refunded.",
@@ -156,13 +178,7 @@ class OrderAdmin(admin.ModelAdmin):
 
 
     def reject_return(self, request, queryset):
-        count = 0
-        for order in queryset:
-            if order.order_status == "RETURN_REQUESTED":
-                order.order_status = "COMPLETED"
-                order.refund_status = "NOT_REFUNDED"
-                order.save()
-                count += 1
+        count = order_states.apply(queryset, "reject_return")
         self.message_user(
             request,
             f"{count} return request(s) rejected.",
@@ -173,14 +189,7 @@ class OrderAdmin(admin.ModelAdmin):
 
 
     def approve_exchange(self, request, queryset):
-        count = 0
-        for order in queryset:
-            if order.order_status == "EXCHANGE_REQUESTED":
-                order.order_status = "EXCHANGED"
-                # refund_status stays NOT_REFUNDED
-                # paid stays True
-                order.save()
-                count += 1
+        count = order_states.apply(queryset, "approve_exchange")
         self.message_user(
             request,
             f"{count} exchange request(s) approved.",
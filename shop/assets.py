@@ -0,0 +1,140 @@
+# shop/assets.py
+#
+# Static asset build. `manage.py build_assets` concatenates and minifies
+# the per-page CSS/JS bundles below, writes them to shop/static/shop/dist/
+# with a content hash in the filename, adds .gz (and .br when the
+# `brotli` package is installed) siblings for WhiteNoise to serve, and
+# records the result in dist/manifest.json. The {% asset_css %} /
+# {% asset_js %} tags (templatetags/shop_assets.py) resolve bundles
+# through that manifest, or link the source files when bundling is off.
+
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz variants without it
+    brotli = None
+
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+OUTPUT_DIR = Path(getattr(settings, "SHOP_ASSETS_DIR", STATIC_DIR / "shop" / "dist"))
+MANIFEST = OUTPUT_DIR / "manifest.json"
+
+# Use bundles in production; link the individual sources while developing
+ENABLED = getattr(settings, "SHOP_ASSET_BUNDLES", not settings.DEBUG)
+
+SITE_CSS = ["shop/style.css", "shop/responsive.css"]
+
+BUNDLES = {
+    "site.css": SITE_CSS,
+    "product_list.css": SITE_CSS + ["shop/product_list.css"],
+    "product_detail.css": SITE_CSS + ["shop/product_detail.css"],
+    "site.js": ["shop/main.js"],
+}
+
+HASH_LENGTH = 12
+
+
+# ================= MINIFY =================
+
+_STRING_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+
+
+def minify_css(source):
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    parts = _STRING_RE.split(source)
+    for i in range(0, len(parts), 2):  # even parts are outside strings
+        code = re.sub(r"\s+", " ", parts[i])
+        # Not around ':' before a selector pseudo-class, '+' or '-': those
+        # spaces can be significant
+        code = re.sub(r"\s*([{};,>])\s*", r"\1", code)
+        code = re.sub(r":\s+", ":", code)
+        code = code.replace(";}", "}")
+        parts[i] = code
+    return "".join(parts).strip()
+
+
+def minify_js(source):
+    try:
+        import rjsmin
+    except ImportError:
+        # Conservative fallback: indentation, blank lines, whole-line comments
+        lines = (line.strip() for line in source.splitlines())
+        return "\n".join(l for l in lines if l and not l.startswith("//"))
+    return rjsmin.jsmin(source)
+
+
+# ================= BUILD =================
+
+def _read(path):
+    return (STATIC_DIR / path).read_text(encoding="utf-8")
+
+
+def build_bundle(name, sources):
+    kind = name.rsplit(".", 1)[1]
+    minify = minify_css if kind == "css" else minify_js
+    separator = "\n" if kind == "css" else ";\n"
+    content = separator.join(minify(_read(src)) for src in sources).encode("utf-8")
+
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    stem = name.rsplit(".", 1)[0]
+    filename = f"{stem}.{digest}.{kind}"
+
+    path = OUTPUT_DIR / filename
+    path.write_bytes(content)
+    path.with_name(filename + ".gz").write_bytes(gzip.compress(content, 9, mtime=0))
+    if brotli is not None:
+        path.with_name(filename + ".br").write_bytes(brotli.compress(content))
+
+    return filename, len(content)
+
+
+def build():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    prefix = OUTPUT_DIR.relative_to(STATIC_DIR).as_posix()
+
+    manifest, sizes = {}, {}
+    for name, sources in BUNDLES.items():
+        filename, size = build_bundle(name, sources)
+        manifest[name] = f"{prefix}/{filename}"
+        sizes[name] = (sum(len(_read(s).encode("utf-8")) for s in sources), size)
+
+    # Drop files from earlier builds
+    keep = {Path(p).name for p in manifest.values()}
+    for f in OUTPUT_DIR.iterdir():
+        if f.name != MANIFEST.name and f.name.split(".gz")[0].split(".br")[0] not in keep:
+            f.unlink()
+
+    MANIFEST.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    _manifest_cache.clear()
+    return manifest, sizes
+
+
+# ================= LOOKUP =================
+
+_manifest_cache = {}
+
+
+def load_manifest():
+    if "data" not in _manifest_cache:
+        try:
+            _manifest_cache["data"] = json.loads(MANIFEST.read_text())
+        except (OSError, ValueError):
+            _manifest_cache["data"] = {}
+    return _manifest_cache["data"]
+
+
+def resolve(name):
+    # Static paths to link for a bundle: one hashed file when built,
+    # otherwise the sources
+    if ENABLED:
+        path = load_manifest().get(name)
+        if path:
+            return [path]
+    return BUNDLES[name]
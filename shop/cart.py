@@ -0,0 +1,439 @@
+# shop/cart.py
+#
+# Cart service shared by cart_view, checkout and the cart APIs.
+#
+# Storage is pluggable (SHOP_CART_BACKEND):
+#
+#   "db"     CartItem rows keyed by the session key (the default). The
+#            whole cart (items + product + category + count + subtotal) is
+#            read in one query: totals are SUM() OVER () window columns and
+#            the unit price is the offer-aware price computed in SQL.
+#   "cache"  Lines kept in the Django cache under a random id from a signed
+#            cookie. Browsing and adding to the cart write no session or
+#            CartItem rows; the lines only reach the database as OrderItems
+#            at checkout. Needs a cache shared by all workers.
+#
+# Both backends expose the same interface (items / count / subtotal, add,
+# remove, update_quantities, clear, checkout_lines). The loaded cart is
+# memoized on the request, so the cart fragment, totals and nav badge share
+# a single load. Call `invalidate_cart(request)` after writes.
+
+import secrets
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import (
+    Case,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Q,
+    Sum,
+    When,
+    Window,
+)
+
+from .db import lock_for_update
+from .models import CartItem, Product
+
+
+BACKEND = getattr(settings, "SHOP_CART_BACKEND", "db")
+
+COOKIE_NAME = getattr(settings, "SHOP_CART_COOKIE_NAME", "shop_cart")
+COOKIE_SALT = "shop.cart"
+CART_AGE = getattr(settings, "SHOP_CART_AGE", 60 * 60 * 24 * 30)
+MAX_QUANTITY = getattr(settings, "SHOP_CART_MAX_QUANTITY", 99)
+CHECKOUT_LOCK_TIMEOUT = 30
+WRITE_LOCK_TIMEOUT = 5
+
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+CENTS = Decimal("0.01")
+
+# Product.get_display_price() as a SQL expression, from CartItem's side
+UNIT_PRICE = Case(
+    When(
+        Q(product__is_on_offer=True) & Q(product__offer_price__isnull=False),
+        then=F("product__offer_price"),
+    ),
+    default=F("product__price"),
+    output_field=MONEY,
+)
+LINE_TOTAL = ExpressionWrapper(UNIT_PRICE * F("quantity"), output_field=MONEY)
+
+
+def _money(value):
+    return Decimal(value or 0).quantize(CENTS)
+
+
+# ================= BACKENDS =================
+
+class BaseCart:
+    def __init__(self):
+        self._items = None
+
+    def load(self):
+        raise NotImplementedError
+
+    @property
+    def items(self):
+        if self._items is None:
+            self._items = self.load()
+        return self._items
+
+    @property
+    def count(self):
+        return sum(item.quantity for item in self.items)
+
+    @property
+    def subtotal(self):
+        return _money(sum(item.line_total for item in self.items))
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def invalidate(self):
+        self._items = None
+
+    def is_current(self, request):
+        return True
+
+    # Writes: add / remove / update_quantities / clear
+    # Checkout (inside place_order's transaction):
+    #   checkout_lines() -> [(product, quantity, size, unit price)]
+    #   checkout_done()  -> empty the purchased lines
+    #   checkout_failed() -> the transaction rolled back
+
+    def checkout_failed(self):
+        pass
+
+
+class DatabaseCart(BaseCart):
+    def __init__(self, request=None, session_key=None):
+        super().__init__()
+        self.request = request
+        if session_key is None and request is not None:
+            session_key = request.session.session_key
+        self.session_key = session_key or ""
+        self._checkout_ids = []
+
+    def is_current(self, request):
+        # login() cycles the session key
+        return self.session_key == (request.session.session_key or "")
+
+    def _require_key(self):
+        if not self.session_key:
+            if not self.request.session.session_key:
+                self.request.session.create()
+            self.session_key = self.request.session.session_key
+        return self.session_key
+
+    def queryset(self):
+        return CartItem.objects.filter(session_key=self.session_key)
+
+    def load(self):
+        if not self.session_key:
+            return []
+        items = list(
+            self.queryset()
+            .select_related("product", "product__category")
+            .annotate(
+                unit_price=UNIT_PRICE,
+                line_total=LINE_TOTAL,
+                cart_count=Window(Sum("quantity")),
+                cart_subtotal=Window(Sum(LINE_TOTAL)),
+            )
+            .order_by("added_at", "id")
+        )
+        for item in items:
+            item.unit_price = _money(item.unit_price)
+            item.line_total = _money(item.line_total)
+        return items
+
+    @property
+    def count(self):
+        return self.items[0].cart_count if self.items else 0
+
+    @property
+    def subtotal(self):
+        return _money(self.items[0].cart_subtotal) if self.items else _money(0)
+
+    def add(self, product, quantity, size=None):
+        item, created = CartItem.objects.get_or_create(
+            session_key=self._require_key(),
+            product=product,
+            size=size,
+            defaults={"quantity": quantity},
+        )
+        if not created:
+            item.quantity += quantity
+            item.save(update_fields=["quantity"])
+        self.invalidate()
+
+    def remove(self, item_id):
+        if self.session_key:
+            self.queryset().filter(id=item_id).delete()
+        self.invalidate()
+
+    def clear(self):
+        if self.session_key:
+            self.queryset().delete()
+        self._items = []
+
+    def update_quantities(self, quantities):
+        # quantities: {item_id: qty}; qty <= 0 removes the line.
+        # One SELECT, one bulk UPDATE, one DELETE, all in one transaction.
+        if not quantities or not self.session_key:
+            return 0, 0
+
+        with transaction.atomic():
+            rows = self.queryset().filter(id__in=list(quantities)).only("id", "quantity")
+
+            changed, removed = [], []
+            for item in rows:
+                qty = quantities[item.id]
+                if qty <= 0:
+                    removed.append(item.id)
+                elif qty != item.quantity:
+                    item.quantity = qty
+                    changed.append(item)
+
+            if changed:
+                CartItem.objects.bulk_update(changed, ["quantity"])
+            if removed:
+                CartItem.objects.filter(id__in=removed).delete()
+
+        self.invalidate()
+        return len(changed), len(removed)
+
+    def checkout_lines(self):
+        # Lock + re-read the rows so two checkouts can't both buy them
+        rows = list(
+            lock_for_update(self.queryset(), "quantity")
+            .select_related("product")
+            .annotate(unit_price=UNIT_PRICE)
+            .order_by("added_at", "id")
+        )
+        self._checkout_ids = [item.id for item in rows]
+        return [
+            (item.product, item.quantity, item.size, _money(item.unit_price))
+            for item in rows
+        ]
+
+    def checkout_done(self):
+        if self._checkout_ids:
+            CartItem.objects.filter(id__in=self._checkout_ids).delete()
+        self._items = []
+
+
+class CartLine:
+    # A cache-stored cart line, shaped like an annotated CartItem
+    def __init__(self, id, product, quantity, size):
+        self.id = id
+        self.product = product
+        self.product_id = product.id
+        self.quantity = quantity
+        self.size = size
+        self.unit_price = _money(product.get_display_price())
+        self.line_total = _money(self.unit_price * quantity)
+
+    @property
+    def total_price(self):
+        return self.line_total
+
+
+class CacheCart(BaseCart):
+    # Stored value: {"next_id": int, "lines": [{"id", "product_id", "quantity", "size"}]}
+
+    def __init__(self, request):
+        super().__init__()
+        self.request = request
+        self.cart_id = request.get_signed_cookie(COOKIE_NAME, default=None, salt=COOKIE_SALT)
+        # Set by the first write; CartCookieMiddleware sends the cookie
+        self.new_cookie = False
+        self._checkout_marker = False
+
+    def _key(self, suffix=""):
+        return f"shop:cart:{self.cart_id}{suffix}"
+
+    def _read(self):
+        data = cache.get(self._key()) if self.cart_id else None
+        return data or {"next_id": 1, "lines": []}
+
+    def _write(self, data):
+        if not self.cart_id:
+            self.cart_id = secrets.token_urlsafe(18)
+            self.new_cookie = True
+        if data["lines"]:
+            cache.set(self._key(), data, CART_AGE)
+        else:
+            cache.delete(self._key())
+        self.invalidate()
+
+    @contextmanager
+    def _locked(self):
+        # Writes are get-modify-set of the whole stored cart: without this
+        # two concurrent adds would each drop the other's line. The lock
+        # expires on its own if a worker dies holding it.
+        if not self.cart_id:
+            yield
+            return
+        key, token = self._key(":lock"), secrets.token_hex(8)
+        while not cache.add(key, token, WRITE_LOCK_TIMEOUT):
+            time.sleep(0.005)
+        try:
+            yield
+        finally:
+            if cache.get(key) == token:
+                cache.delete(key)
+
+    def _lines(self, data, products):
+        return [
+            CartLine(line["id"], products[line["product_id"]], line["quantity"], line["size"])
+            for line in data["lines"]
+            if line["product_id"] in products
+        ]
+
+    def load(self):
+        data = self._read()
+        if not data["lines"]:
+            return []
+        products = Product.objects.select_related("category").in_bulk(
+            {line["product_id"] for line in data["lines"]}
+        )
+        return self._lines(data, products)
+
+    def add(self, product, quantity, size=None):
+        with self._locked():
+            data = self._read()
+            for line in data["lines"]:
+                if line["product_id"] == product.id and line["size"] == size:
+                    line["quantity"] += quantity
+                    break
+            else:
+                data["lines"].append({
+                    "id": data["next_id"],
+                    "product_id": product.id,
+                    "quantity": quantity,
+                    "size": size,
+                })
+                data["next_id"] += 1
+            self._write(data)
+
+    def remove(self, item_id):
+        with self._locked():
+            data = self._read()
+            data["lines"] = [line for line in data["lines"] if line["id"] != item_id]
+            self._write(data)
+
+    def clear(self):
+        if self.cart_id:
+            cache.delete(self._key())
+        self._items = []
+
+    def update_quantities(self, quantities):
+        if not quantities:
+            return 0, 0
+
+        changed = removed = 0
+        with self._locked():
+            data = self._read()
+            lines = []
+            for line in data["lines"]:
+                qty = quantities.get(line["id"])
+                if qty is not None and qty <= 0:
+                    removed += 1
+                    continue
+                if qty is not None and qty != line["quantity"]:
+                    line["quantity"] = qty
+                    changed += 1
+                lines.append(line)
+            data["lines"] = lines
+            self._write(data)
+        return changed, removed
+
+    def checkout_lines(self):
+        # The cache has no row locks: a short-lived marker keeps a double
+        # submit from buying the same lines twice
+        if not self.cart_id or not cache.add(self._key(":checkout"), 1, CHECKOUT_LOCK_TIMEOUT):
+            return []
+        self._checkout_marker = True
+
+        data = self._read()
+        products = Product.objects.in_bulk({line["product_id"] for line in data["lines"]})
+        return [
+            (line.product, line.quantity, line.size, line.unit_price)
+            for line in self._lines(data, products)
+        ]
+
+    def checkout_done(self):
+        def finish():
+            self.clear()
+            self._release_checkout()
+        transaction.on_commit(finish)
+        self._items = []
+
+    def checkout_failed(self):
+        # Let the visitor retry right away instead of after the timeout
+        self._release_checkout()
+
+    def _release_checkout(self):
+        if self._checkout_marker:
+            self._checkout_marker = False
+            cache.delete(self._key(":checkout"))
+
+
+BACKENDS = {
+    "db": DatabaseCart,
+    "cache": CacheCart,
+}
+
+
+def parse_quantities(data):
+    # Collect `qty_<item id>` fields from a cart form / API POST
+    quantities = {}
+    errors = []
+    for key, value in data.items():
+        if not key.startswith("qty_"):
+            continue
+        try:
+            item_id = int(key[4:])
+            qty = int(value)
+        except (TypeError, ValueError):
+            errors.append(f"Invalid quantity for {key}.")
+            continue
+        # 0 (or less) removes the line
+        if qty > MAX_QUANTITY:
+            errors.append(f"Quantity for {key} can be at most {MAX_QUANTITY}.")
+            continue
+        quantities[item_id] = max(qty, 0)
+    if errors:
+        raise ValidationError(errors)
+    return quantities
+
+
+# ================= REQUEST MEMO =================
+
+def get_cart(request):
+    cart = getattr(request, "_shop_cart", None)
+    if cart is None or not cart.is_current(request):
+        cart = BACKENDS[BACKEND](request)
+        request._shop_cart = cart
+    return cart
+
+
+def invalidate_cart(request):
+    cart = getattr(request, "_shop_cart", None)
+    if cart is not None:
+        cart.invalidate()
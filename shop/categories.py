@@ -0,0 +1,92 @@
+# shop/categories.py
+#
+# Versioned in-process category cache. Each worker keeps the full category
+# list (with precomputed URLs) in memory. A version token in the shared
+# Django cache is bumped on every Category save/delete; a worker that sees
+# a different token reloads. The token doubles as the ETag/Last-Modified
+# of api_categories.
+#
+# Inside CategoryVersionMiddleware the token is read from the shared cache
+# once per request; every lookup after that is served from the snapshot.
+
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+
+from . import db_router
+from .models import Category
+
+
+VERSION_KEY = "shop:categories:version"
+
+# {"version": token} for the current request; None outside the middleware
+_request = ContextVar("shop_categories_request", default=None)
+
+_lock = threading.Lock()
+_state = {
+    "version": None,
+    "categories": [],
+    "by_slug": {},
+}
+
+
+def start():
+    return _request.set({})
+
+
+def stop(token):
+    _request.reset(token)
+
+
+def version():
+    memo = _request.get()
+    if memo and "version" in memo:
+        return memo["version"]
+
+    token = cache.get(VERSION_KEY)
+    if token is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        token = cache.get(VERSION_KEY)
+    if memo is not None:
+        memo["version"] = token
+    return token
+
+
+def last_modified():
+    return datetime.fromtimestamp(version() // 1_000_000_000, tz=dt_timezone.utc)
+
+
+def _snapshot():
+    token = version()
+    if _state["version"] != token:
+        with _lock:
+            if _state["version"] != token:
+                with db_router.primary():
+                    categories = list(Category.objects.order_by("id"))
+                for c in categories:
+                    c.url = c.get_absolute_url()
+                _state.update(
+                    version=token,
+                    categories=categories,
+                    by_slug={c.slug: c for c in categories},
+                )
+    return _state
+
+
+def all_categories():
+    return _snapshot()["categories"]
+
+
+def get_by_slug(slug):
+    return _snapshot()["by_slug"].get(slug)
+
+
+def invalidate():
+    token = time.time_ns()
+    cache.set(VERSION_KEY, token, None)
+    memo = _request.get()
+    if memo is not None:
+        memo["version"] = token
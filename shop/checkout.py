@@ -0,0 +1,70 @@
+# shop/checkout.py
+#
+# Order placement pipeline. Everything runs in one transaction:
+#
+#   1. lock + re-read the cart lines (for the CartItem backend: prices
+#      computed in SQL, one query)
+#   2. INSERT the Order (+ its first status event)
+#   3. bulk_create all OrderItems (one INSERT)
+#   4. empty the purchased cart lines (one statement)
+#
+# A crash part-way leaves nothing behind, and two concurrent checkouts of
+# the same cart can't both place an order: the second one finds the cart
+# already empty. Works with any cart backend from shop/cart.py; if the
+# transaction fails the cart is told (checkout_failed) so it can release
+# whatever checkout_lines() reserved.
+
+from django.db import transaction
+
+from .cart import DatabaseCart
+from .models import OrderItem, OrderStatusEvent
+
+
+class EmptyCart(Exception):
+    pass
+
+
+def place_order(order, session_key=None, buy_now=None, cart=None):
+    # Lines come from buy_now (product, quantity, size), a cart backend
+    # (get_cart(request)), or the CartItem rows of session_key
+    try:
+        with transaction.atomic():
+            if buy_now:
+                product, quantity, size = buy_now
+                lines = [(product, quantity, size, product.get_display_price())]
+                cart = None
+            else:
+                if cart is None:
+                    cart = DatabaseCart(session_key=session_key)
+                lines = cart.checkout_lines()
+                if not lines:
+                    raise EmptyCart()
+
+            order.save()
+            OrderStatusEvent.objects.create(
+                order=order,
+                transition="place",
+                from_status="",
+                to_status=order.order_status,
+                refund_status=order.refund_status,
+            )
+
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    product=product,
+                    quantity=quantity,
+                    price=price,
+                    size=size,
+                )
+                for product, quantity, size, price in lines
+            ])
+
+            if cart is not None:
+                cart.checkout_done()
+    except BaseException:
+        if cart is not None:
+            cart.checkout_failed()
+        raise
+
+    return order
@@ -0,0 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+
+from .cart import get_cart
+from .wishlist import wishlist_ids
+
+
+def cart(request):
+    # Lazy: only pages that render the badge touch the cart, and they share
+    # the request's memoized load with the view.
+    return {"cart": SimpleLazyObject(lambda: get_cart(request))}
+
+
+def wishlist(request):
+    # Product ids the visitor has wishlisted, for the grid hearts
+    return {"wishlist_ids": SimpleLazyObject(lambda: wishlist_ids(request))}
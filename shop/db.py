@@ -0,0 +1,60 @@
+# shop/db.py
+#
+# Small database helpers shared across shop modules.
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F
+
+
+def lock_for_update(queryset, touch_field):
+    # SELECT ... FOR UPDATE where the backend supports it. SQLite doesn't:
+    # with transaction_mode IMMEDIATE/EXCLUSIVE (the default in settings)
+    # atomic() already holds the write lock; in a DEFERRED transaction a
+    # no-op UPDATE of `touch_field` takes it up front instead. Must be
+    # called inside transaction.atomic().
+    connection = connections[queryset.db]
+    if connection.vendor == "sqlite" and not _sqlite_locks_on_begin(connection):
+        queryset.update(**{touch_field: F(touch_field)})
+    return queryset.select_for_update(of=("self",))
+
+
+def _sqlite_locks_on_begin(connection):
+    mode = connection.settings_dict["OPTIONS"].get("transaction_mode") or ""
+    return mode.upper() in ("IMMEDIATE", "EXCLUSIVE")
+
+
+# ================= SQLITE TUNING =================
+# Applied to every new SQLite connection (connection_created, see
+# signals.py). Rollback-journal mode lets one writer block all readers
+# and fails fast under concurrent gunicorn workers; WAL lets readers run
+# next to the writer, and busy_timeout makes writers queue instead of
+# raising "database is locked".
+#
+# settings.SHOP_SQLITE_PRAGMAS overrides single entries (None drops one);
+# SHOP_SQLITE_PRAGMAS = False turns the hook off.
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "busy_timeout": 5000,         # ms
+    "synchronous": "NORMAL",      # durable across app crashes in WAL mode
+    "cache_size": -64000,         # KiB when negative: 64 MB page cache
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+def sqlite_pragmas():
+    overrides = getattr(settings, "SHOP_SQLITE_PRAGMAS", {})
+    if overrides is False:
+        return {}
+    pragmas = {**SQLITE_PRAGMAS, **overrides}
+    return {name: value for name, value in pragmas.items() if value is not None}
+
+
+def configure_sqlite(connection):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,96 @@
+# shop/db_router.py
+#
+# Primary / read-replica routing (settings.DATABASE_ROUTERS). When a
+# "replica" database is configured, catalog reads (Product, Category,
+# OfferAd, ProductComment) in safe requests go to it; everything else
+# (carts, orders, sessions, users, all writes) stays on "default".
+#
+# Reads only use the replica where ReplicaMiddleware allows it, so
+# management commands, signals and scripts always see their own writes.
+# Within a request the replica is dropped as soon as anything is written
+# or a transaction is open on the primary, and the middleware keeps the
+# visitor on the primary for SHOP_REPLICA_PIN_SECONDS after a write to
+# hide replication lag (read-your-writes).
+#
+# Reads whose result is stored in a shared or per-worker cache (category
+# list, quick-view fragments, active offer ads) run under `primary()`:
+# a lagging replica would otherwise put stale rows back under a freshly
+# bumped version and keep them there until the next invalidation.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+REPLICA = "replica"
+
+CATALOG_MODELS = {"product", "category", "offerad", "productcomment"}
+
+
+class RequestState:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+# None outside ReplicaMiddleware: reads always go to the primary
+_state = ContextVar("shop_replica_state", default=None)
+
+
+def enabled():
+    return REPLICA in settings.DATABASES
+
+
+def start(pinned=False):
+    state = RequestState(pinned)
+    return state, _state.set(state)
+
+
+def stop(token):
+    _state.reset(token)
+
+
+@contextmanager
+def primary():
+    state = _state.get()
+    if state is None or state.pinned:
+        yield
+        return
+    state.pinned = True
+    try:
+        yield
+    finally:
+        # A write inside the block keeps the request on the primary
+        state.pinned = state.wrote
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (
+            state is not None
+            and not state.pinned
+            and model._meta.app_label == "shop"
+            and model._meta.model_name in CATALOG_MODELS
+            and enabled()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA}
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica gets its schema through replication; a local stand-in
+        # file can be migrated explicitly with `migrate --database replica`
+        return None
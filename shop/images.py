@@ -0,0 +1,137 @@
+# shop/images.py
+#
+# Responsive variants for Product.image. Every upload gets thumb / card /
+# detail widths in WebP and JPEG, written next to the original under
+# `<upload dir>/variants/`. Rendering runs in a process pool after the
+# saving transaction commits; the `{% responsive_image %}` tag
+# (templatetags/shop_images.py) emits the matching srcset and falls back
+# to the original file until the variants exist.
+
+import logging
+import os
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+
+VARIANTS = {
+    "thumb": 160,
+    "card": 400,
+    "detail": 800,
+}
+
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+logger = logging.getLogger(__name__)
+
+WORKERS = getattr(settings, "SHOP_IMAGE_WORKERS", 2)
+ASYNC = getattr(settings, "SHOP_IMAGE_VARIANTS_ASYNC", True)
+
+
+# ================= NAMING =================
+
+def variant_name(name, variant, fmt):
+    directory, filename = posixpath.split(name)
+    stem = os.path.splitext(filename)[0]
+    ext = "jpg" if fmt == "jpeg" else fmt
+    return posixpath.join(directory, "variants", f"{stem}-{variant}.{ext}")
+
+
+def variant_names(name):
+    return [
+        variant_name(name, variant, fmt)
+        for variant in VARIANTS
+        for fmt in FORMATS
+    ]
+
+
+def has_variants(name):
+    # The last variant written is the marker that a set is complete
+    return default_storage.exists(variant_name(name, "detail", "jpeg"))
+
+
+# ================= RENDERING =================
+
+def render_variants(src_path, dest_paths):
+    # Runs in a worker process: plain Pillow + filesystem, no Django.
+    # dest_paths: {(variant, fmt): absolute path}
+    from PIL import Image, ImageOps
+
+    with Image.open(src_path) as original:
+        original = ImageOps.exif_transpose(original)
+        has_alpha = original.mode in ("RGBA", "LA", "P")
+
+        for variant, width in VARIANTS.items():
+            resized = original.copy()
+            resized.thumbnail((width, width * 4), Image.LANCZOS)
+
+            for fmt, (pil_format, options) in FORMATS.items():
+                image = resized
+                if pil_format == "JPEG":
+                    if has_alpha:
+                        image = image.convert("RGBA")
+                        background = Image.new("RGB", image.size, (255, 255, 255))
+                        background.paste(image, mask=image.split()[-1])
+                        image = background
+                    else:
+                        image = image.convert("RGB")
+                elif image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA" if has_alpha else "RGB")
+
+                path = dest_paths[(variant, fmt)]
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.tmp"
+                image.save(tmp, pil_format, **options)
+                os.replace(tmp, path)
+
+    return src_path
+
+
+def job_paths(name):
+    # (source path, {(variant, fmt): destination path}) for render_variants
+    return (
+        default_storage.path(name),
+        {
+            (variant, fmt): default_storage.path(variant_name(name, variant, fmt))
+            for variant in VARIANTS
+            for fmt in FORMATS
+        },
+    )
+
+
+_executor = None
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=WORKERS)
+    return _executor
+
+
+def generate(name, wait=False):
+    # Queue (or, with wait=True / async disabled, run) variant rendering
+    src_path, dest_paths = job_paths(name)
+    if wait or not ASYNC:
+        return render_variants(src_path, dest_paths)
+
+    future = executor().submit(render_variants, src_path, dest_paths)
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def _log_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.error("Image variant generation failed: %s", error)
+
+
+def delete_variants(name):
+    for variant in variant_names(name):
+        if default_storage.exists(variant):
+            default_storage.delete(variant)
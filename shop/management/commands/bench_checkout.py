@@ -0,0 +1,152 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, close_old_connections, connections
+from django.test.utils import override_settings
+
+from shop.checkout import EmptyCart, place_order
+from shop.models import CartItem, Order, OrderItem, Product
+
+
+BENCH_EMAIL = "bench-checkout@example.com"
+
+
+def legacy_checkout(order, session_key):
+    # The pre-pipeline code path: no transaction, one INSERT per line
+    items = CartItem.objects.filter(session_key=session_key)
+    order.save()
+    for item in items:
+        OrderItem.objects.create(
+            order=order,
+            product=item.product,
+            quantity=item.quantity,
+            price=item.product.get_display_price(),
+            size=item.size,
+        )
+    items.delete()
+
+
+@contextmanager
+def untuned_sqlite():
+    # SQLite as it behaves without the shop/db.py connection hook and the
+    # IMMEDIATE transaction mode: rollback journal, default timeouts
+    connection = connections[DEFAULT_DB_ALIAS]
+    options = connection.settings_dict["OPTIONS"]
+    transaction_mode = options.pop("transaction_mode", None)
+    connection.close()
+    try:
+        with override_settings(SHOP_SQLITE_PRAGMAS=False):
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode = DELETE")
+            yield
+    finally:
+        connection.close()
+        if transaction_mode is not None:
+            options["transaction_mode"] = transaction_mode
+        # Reconnecting runs the hook again, which restores WAL
+
+
+class Command(BaseCommand):
+    help = (
+        "Run many simultaneous checkouts against the configured database "
+        "and report throughput. Creates and then deletes its own orders."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--checkouts", type=int, default=200, help="Total checkouts.")
+        parser.add_argument("--lines", type=int, default=10, help="Cart lines per checkout.")
+        parser.add_argument("--legacy", action="store_true", help="Benchmark the old per-line path.")
+        parser.add_argument("--keep", action="store_true", help="Keep the generated orders.")
+        parser.add_argument(
+            "--compare-sqlite-tuning", action="store_true",
+            help="SQLite: run once untuned (rollback journal, default timeouts) and "
+                 "once with the configured PRAGMAs, and report both.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["compare_sqlite_tuning"]:
+            self.run(options, "legacy" if options["legacy"] else "pipeline")
+            return
+
+        if connections[DEFAULT_DB_ALIAS].vendor != "sqlite":
+            raise CommandError("--compare-sqlite-tuning needs a SQLite database.")
+        with untuned_sqlite():
+            before = self.run(options, "untuned")
+        after = self.run(options, "tuned")
+        if before:
+            self.stdout.write(self.style.SUCCESS(f"throughput: {after / before:.2f}x"))
+
+    def run(self, options, label):
+        # Returns orders/s
+        product_ids = list(Product.objects.values_list("id", flat=True)[:options["lines"]])
+        if not product_ids:
+            raise CommandError("Need at least one Product to check out.")
+
+        run_id = uuid.uuid4().hex[:8]
+        sessions = [f"bench-{run_id}-{n}" for n in range(options["checkouts"])]
+        CartItem.objects.bulk_create([
+            CartItem(session_key=key, product_id=pk, quantity=1 + n % 3)
+            for key in sessions
+            for n, pk in enumerate(product_ids)
+        ])
+
+        queue = list(sessions)
+        lock = threading.Lock()
+        stats = {"ok": 0, "empty": 0, "locked": 0, "latencies": []}
+
+        def worker():
+            close_old_connections()
+            try:
+                while True:
+                    with lock:
+                        if not queue:
+                            return
+                        key = queue.pop()
+                    order = Order(name="Bench", email=BENCH_EMAIL, address="-")
+                    start = time.perf_counter()
+                    try:
+                        if options["legacy"]:
+                            legacy_checkout(order, key)
+                        else:
+                            place_order(order, session_key=key)
+                        outcome = "ok"
+                    except EmptyCart:
+                        outcome = "empty"
+                    except OperationalError:
+                        outcome = "locked"
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        stats[outcome] += 1
+                        stats["latencies"].append(elapsed)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(options["threads"])]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - started
+
+        latencies = sorted(stats["latencies"]) or [0]
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+        self.stdout.write(
+            f"{label}: {stats['ok']} orders in {wall:.2f}s "
+            f"({stats['ok'] / wall:.1f} orders/s), p50 {p50:.1f} ms, p95 {p95:.1f} ms, "
+            f"{stats['locked']} 'database is locked' errors, {stats['empty']} empty carts"
+        )
+
+        # Orphans (orders with no items) are what the legacy path leaves behind
+        orphans = Order.objects.filter(email=BENCH_EMAIL, items__isnull=True).count()
+        self.stdout.write(f"orders without items: {orphans}")
+
+        if not options["keep"]:
+            Order.objects.filter(email=BENCH_EMAIL).delete()
+            CartItem.objects.filter(session_key__startswith=f"bench-{run_id}-").delete()
+        return stats["ok"] / wall
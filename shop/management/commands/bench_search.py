@@ -0,0 +1,65 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from shop import search
+from shop.models import Product
+
+
+DEFAULT_QUERIES = ["shoe", "casual", "calvin klein", "cro", "clsssic", "leather boot"]
+
+
+def icontains_search(q):
+    return list(
+        Product.objects.filter(available=True).filter(
+            Q(name__icontains=q) |
+            Q(description__icontains=q) |
+            Q(category__name__icontains=q)
+        ).values_list("id", flat=True)
+    )
+
+
+def index_search(q):
+    return list(
+        search.filter_queryset(Product.objects.filter(available=True), q)
+        .values_list("id", flat=True)
+    )
+
+
+class Command(BaseCommand):
+    help = "Compare the indexed product search against the old icontains scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("queries", nargs="*", default=DEFAULT_QUERIES)
+        parser.add_argument("--iterations", type=int, default=50)
+
+    def _time(self, fn, q, iterations):
+        fn(q)  # warm up
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            hits = fn(q)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return statistics.mean(samples), p95, len(hits)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        self.stdout.write(
+            f"{Product.objects.count()} products, backend={search.get_backend().name}, "
+            f"{iterations} iterations per query"
+        )
+        self.stdout.write(
+            f"{'query':<20} {'icontains ms':>13} {'p95':>8} {'hits':>6}"
+            f" {'index ms':>10} {'p95':>8} {'hits':>6}"
+        )
+        for q in options["queries"]:
+            old = self._time(icontains_search, q, iterations)
+            new = self._time(index_search, q, iterations)
+            self.stdout.write(
+                f"{q:<20} {old[0]:>13.2f} {old[1]:>8.2f} {old[2]:>6}"
+                f" {new[0]:>10.2f} {new[1]:>8.2f} {new[2]:>6}"
+            )
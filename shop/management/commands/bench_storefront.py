@@ -0,0 +1,236 @@
+import json
+import platform
+import statistics
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from shop import seed
+from shop.models import Product
+
+
+BENCH_USER = "bench-storefront"
+
+BENCH_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "bench-storefront",
+    },
+}
+
+CHECKOUT_FORM = {
+    "name": "Bench Customer",
+    "email": "bench@example.com",
+    "address": "1 Benchmark Street",
+    "payment_method": "cod",
+}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the storefront hot paths (listing, detail, cart, checkout, "
+        "UPI QR) through the test client on a freshly seeded test database. "
+        "Reports throughput, p50/p95 latency and query counts; optionally "
+        "writes JSON and fails on regressions against a previous run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=2000)
+        parser.add_argument("--comments", type=int, default=10000)
+        parser.add_argument("--orders", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--iterations", type=int, default=50, help="Timed requests per path.")
+        parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per path.")
+        parser.add_argument("--only", nargs="*", help="Benchmark only these path names.")
+        parser.add_argument("--output", help="Write results to this JSON file.")
+        parser.add_argument("--compare", metavar="BASELINE", help="JSON file from an earlier run.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.25,
+            help="With --compare: fail when p95 grows by more than this fraction "
+                 "or a path issues more queries (default 0.25).",
+        )
+        parser.add_argument(
+            "--existing-db", action="store_true",
+            help="Run against the configured database as-is instead of a seeded test database.",
+        )
+
+    # ================= SCENARIOS =================
+    # name -> (setup(client) run once, request(client, n) per iteration)
+
+    def scenarios(self):
+        products = list(
+            Product.objects.filter(available=True).order_by("-rating_count", "id")
+            .values_list("id", "slug", "name")[:50]
+        )
+        if not products:
+            raise CommandError("No available products to benchmark.")
+        word = products[0][2].split()[0]
+
+        def login(client):
+            user, _ = get_user_model().objects.get_or_create(username=BENCH_USER)
+            client.force_login(user)
+
+        def fill_cart(client):
+            for pk, _, _ in products[:3]:
+                client.post("/api/cart/add/", {"product_id": pk, "quantity": 1})
+
+        def place_order(client, n):
+            fill_cart(client)  # untimed: see _run
+            return "post", "/checkout/", CHECKOUT_FORM
+
+        return {
+            "product_list": (None, lambda c, n: ("get", "/", None)),
+            "product_list_q": (None, lambda c, n: ("get", f"/?q={word}", None)),
+            "product_list_sort": (None, lambda c, n: ("get", "/?sort=price_asc", None)),
+            "product_detail": (None, lambda c, n: ("get", f"/product/{products[n % len(products)][1]}/", None)),
+            "api_cart_add": (None, lambda c, n: (
+                "post", "/api/cart/add/", {"product_id": products[n % len(products)][0], "quantity": 1}
+            )),
+            "api_cart_summary": (fill_cart, lambda c, n: ("get", "/api/cart/summary/", None)),
+            "cart_view": (fill_cart, lambda c, n: ("get", "/cart/", None)),
+            "checkout": (login, place_order),
+            "upi_qr": (None, lambda c, n: ("get", f"/upi-qr/?app=gpay&amount={[199, 499, 999][n % 3]}", None)),
+        }
+
+    def _run(self, name, setup, make_request, iterations, warmup):
+        client = Client()
+        if setup:
+            setup(client)
+
+        latencies, queries = [], []
+        for n in range(warmup + iterations):
+            method, url, data = make_request(client, n)
+            # Every alias: catalog reads may go to a read replica
+            with ExitStack() as stack:
+                captured = [stack.enter_context(CaptureQueriesContext(c)) for c in connections.all()]
+                started = time.perf_counter()
+                response = getattr(client, method)(url, data or {})
+                elapsed = time.perf_counter() - started
+            if response.status_code >= 400:
+                raise CommandError(f"{name}: {method.upper()} {url} returned {response.status_code}")
+            if n >= warmup:
+                latencies.append(elapsed)
+                queries.append(sum(len(c) for c in captured))
+
+        total = sum(latencies)
+        return {
+            "iterations": iterations,
+            "throughput_rps": round(iterations / total, 1) if total else None,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+            "queries": int(statistics.median(queries)),
+        }
+
+    # ================= MAIN =================
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be >= 1.")
+
+        setup_test_environment()
+        with ExitStack() as stack:
+            stack.callback(teardown_test_environment)
+            if options["existing_db"]:
+                # Everything the run writes (carts, orders) is rolled back
+                # at the end, also when it fails
+                stack.enter_context(transaction.atomic())
+                stack.callback(transaction.set_rollback, True)
+            else:
+                # Also points mirrors (a configured read replica) at the test database
+                old_config = setup_databases(verbosity=0, interactive=False, aliases={"default"})
+                stack.callback(teardown_databases, old_config, verbosity=0)
+            # The shared cache is never read or cleared: the run gets a private one
+            stack.enter_context(override_settings(CACHES=BENCH_CACHES))
+
+            if not options["existing_db"]:
+                started = time.perf_counter()
+                seed.seed(
+                    products=options["products"],
+                    comments=options["comments"],
+                    orders=options["orders"],
+                    seed=options["seed"],
+                )
+                self.stdout.write(f"Seeded test database in {time.perf_counter() - started:.1f}s")
+            cache.clear()
+
+            results = {}
+            for name, (setup, make_request) in self.scenarios().items():
+                if options["only"] and name not in options["only"]:
+                    continue
+                results[name] = self._run(
+                    name, setup, make_request, options["iterations"], options["warmup"]
+                )
+                r = results[name]
+                self.stdout.write(
+                    f"{name:<20} {r['throughput_rps']:>8} req/s  p50 {r['p50_ms']:>8} ms  "
+                    f"p95 {r['p95_ms']:>8} ms  {r['queries']:>3} queries"
+                )
+
+        report = {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "seeded": not options["existing_db"],
+                "products": options["products"],
+                "comments": options["comments"],
+                "orders": options["orders"],
+                "seed": options["seed"],
+                "iterations": options["iterations"],
+            },
+            "results": results,
+        }
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if options["compare"]:
+            self.compare(results, options["compare"], options["threshold"])
+
+    def compare(self, results, path, threshold):
+        with open(path) as f:
+            baseline = json.load(f)["results"]
+
+        regressions = []
+        for name, current in results.items():
+            before = baseline.get(name)
+            if not before:
+                continue
+            change = current["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0
+            self.stdout.write(
+                f"{name:<20} p95 {before['p95_ms']:>8} -> {current['p95_ms']:>8} ms ({change:+.0%})  "
+                f"queries {before['queries']} -> {current['queries']}"
+            )
+            if change > threshold:
+                regressions.append(f"{name}: p95 {change:+.0%}")
+            if current["queries"] > before["queries"]:
+                regressions.append(f"{name}: {before['queries']} -> {current['queries']} queries")
+
+        if regressions:
+            raise CommandError("Regressions: " + "; ".join(regressions))
+        self.stdout.write(self.style.SUCCESS(f"No regressions beyond {threshold:.0%}."))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from shop import outbox, price_alerts
+
+
+class Command(BaseCommand):
+    help = (
+        "Trigger price-drop alerts for products whose price fell since the last "
+        "run. Reads only new ProductPriceChange rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=outbox.BATCH_SIZE)
+        parser.add_argument("--max-batches", type=int, default=None)
+        parser.add_argument(
+            "--reset",
+            type=int,
+            metavar="CHANGE_ID",
+            help="Move the evaluator's cursor to CHANGE_ID (0 = re-read the whole log) and exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["reset"] is not None:
+            outbox.reset(price_alerts.CONSUMER, options["reset"])
+            self.stdout.write(f"Cursor moved to {options['reset']}.")
+            return
+
+        read, triggered = price_alerts.run(
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {read} price change(s), triggered {triggered} alert(s); "
+            f"{price_alerts.pending()} change(s) still pending."
+        ))
@@ -0,0 +1,43 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from shop import images
+from shop.models import Product
+
+
+class Command(BaseCommand):
+    help = "Backfill responsive WebP/JPEG variants for Product images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=images.WORKERS)
+        parser.add_argument("--force", action="store_true", help="Re-render existing variants too.")
+
+    def handle(self, *args, **options):
+        names = set(
+            Product.objects.exclude(image="").exclude(image=None)
+            .values_list("image", flat=True)
+        )
+        if not options["force"]:
+            names = {n for n in names if not images.has_variants(n)}
+
+        started = time.perf_counter()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            futures = {
+                pool.submit(images.render_variants, *images.job_paths(name)): name
+                for name in sorted(names)
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    done += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{futures[future]}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered variants for {done} image(s) in "
+            f"{time.perf_counter() - started:.1f}s ({failed} failed)."
+        ))
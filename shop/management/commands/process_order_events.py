@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from shop import outbox
+
+
+DEFAULT_CONSUMERS = {
+    "log": "shop.outbox.log_events",
+}
+
+
+class Command(BaseCommand):
+    help = "Deliver new order status events to a consumer in batches, advancing its cursor."
+
+    def add_arguments(self, parser):
+        parser.add_argument("consumer", help="Consumer name (see SHOP_ORDER_EVENT_CONSUMERS).")
+        parser.add_argument("--batch-size", type=int, default=outbox.BATCH_SIZE)
+        parser.add_argument("--max-batches", type=int, default=None)
+        parser.add_argument(
+            "--reset",
+            type=int,
+            metavar="EVENT_ID",
+            help="Move the consumer's cursor to EVENT_ID (0 = replay everything) and exit.",
+        )
+
+    def handle(self, *args, **options):
+        consumer = options["consumer"]
+        consumers = {
+            **DEFAULT_CONSUMERS,
+            **getattr(settings, "SHOP_ORDER_EVENT_CONSUMERS", {}),
+        }
+        if consumer not in consumers:
+            raise CommandError(
+                f"Unknown consumer {consumer!r}. Known: {', '.join(sorted(consumers))}"
+            )
+
+        if options["reset"] is not None:
+            outbox.reset(consumer, options["reset"])
+            self.stdout.write(f"Cursor for {consumer} moved to {options['reset']}.")
+            return
+
+        handler = import_string(consumers[consumer])
+        delivered = outbox.process(
+            consumer,
+            handler,
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Delivered {delivered} event(s) to {consumer}; "
+            f"{outbox.pending(consumer)} still pending."
+        ))
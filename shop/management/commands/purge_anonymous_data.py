@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from shop import purge
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete CartItem / Wishlist / PriceDropAlert rows of expired or missing "
+        "anonymous sessions, then expired sessions, in small id-range chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=30,
+            help="Only purge rows older than this many days (default 30).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=purge.CHUNK_SIZE)
+        parser.add_argument(
+            "--sleep", type=float, default=0,
+            help="Seconds to pause between chunks to yield to live traffic.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count what would be purged without deleting.",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0 or options["chunk_size"] < 1:
+            raise CommandError("--days must be >= 0 and --chunk-size >= 1.")
+
+        verb = "would purge" if options["dry_run"] else "purged"
+
+        def report(label, rows, seconds):
+            rate = rows / seconds if seconds else 0
+            self.stdout.write(
+                f"{label:<24} {verb} {rows:>8} rows in {seconds:6.2f}s ({rate:,.0f} rows/s)"
+            )
+
+        results = purge.purge(
+            days=options["days"],
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+            sleep=options["sleep"],
+            report=report,
+        )
+
+        total = sum(rows for rows, _ in results.values())
+        self.stdout.write(self.style.SUCCESS(f"Total: {verb} {total} rows."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from shop import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product search index (FTS5 or the inverted-index fallback)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--create-fts",
+            action="store_true",
+            help="Create the FTS5 tables if they are missing (SQLite only).",
+        )
+
+    def handle(self, *args, **options):
+        if options["create_fts"]:
+            if connection.vendor != "sqlite" or not search.sqlite_supports_fts5(connection):
+                self.stderr.write("FTS5 is not available on this database; using the inverted index.")
+            else:
+                search.create_fts_tables(connection)
+                search.reset_backend_cache()
+
+        with transaction.atomic():
+            backend, count = search.rebuild(batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} product(s) with the {backend} backend."
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from shop import ratings
+
+
+class Command(BaseCommand):
+    help = "Recount Product rating counters from ProductComment and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted products without writing.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = ratings.reconcile(
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
+
+        verb = "would be fixed" if options["dry_run"] else "fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(drifted)} product(s) with drifted rating counters {verb}."
+        ))
+        if drifted and options["verbosity"] > 1:
+            self.stdout.write("Product ids: " + ", ".join(map(str, drifted)))
@@ -0,0 +1,89 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from shop import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the configured database with deterministic synthetic data for "
+        "scale testing: categories, products, users, comments, orders, "
+        "anonymous carts (with live/expired/missing sessions) and offer ads. "
+        "Adds to existing rows; the same --seed gives the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=100_000)
+        parser.add_argument("--comments", type=int, default=1_000_000)
+        parser.add_argument("--orders", type=int, default=500_000)
+        parser.add_argument("--carts", type=int, default=50_000, help="Anonymous carts (1-5 lines each).")
+        parser.add_argument("--offer-ads", type=int, default=30)
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument("--users", type=int, default=None, help="Default: scaled to comments/orders.")
+        parser.add_argument(
+            "--days", type=int, default=365,
+            help="Spread created_at timestamps over this many past days (default 365).",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--chunk-size", type=int, default=seed.CHUNK_SIZE)
+        parser.add_argument(
+            "--no-index", action="store_true",
+            help="Skip rebuilding the search index (run rebuild_search_index later).",
+        )
+        parser.add_argument(
+            "--fast", action="store_true",
+            help="SQLite only: PRAGMA synchronous=OFF while seeding. Not crash-safe.",
+        )
+
+    def handle(self, *args, **options):
+        counts = ("products", "comments", "orders", "carts", "offer_ads", "categories", "days")
+        if any(options[name] < 0 for name in counts) or options["chunk_size"] < 1:
+            raise CommandError("Counts and --days must be >= 0 and --chunk-size >= 1.")
+        if options["categories"] < 1 or options["products"] < 1:
+            raise CommandError("Need at least one category and one product.")
+
+        if options["fast"]:
+            if connection.vendor != "sqlite":
+                raise CommandError("--fast is SQLite-specific.")
+            with connection.cursor() as cursor:
+                # Restored afterwards (NORMAL from shop.db's PRAGMAs by default)
+                synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+                cursor.execute("PRAGMA synchronous=OFF")
+
+        clock = {"last": time.perf_counter()}
+        started = clock["last"]
+
+        def report(step, rows):
+            now = time.perf_counter()
+            seconds = now - clock["last"]
+            clock["last"] = now
+            rate = rows / seconds if seconds else 0
+            self.stdout.write(f"{step:<14} {rows:>10} rows in {seconds:7.2f}s ({rate:,.0f} rows/s)")
+
+        try:
+            # With DEBUG=True every multi-thousand-row INSERT would be kept in
+            # connection.queries
+            with override_settings(DEBUG=False):
+                seed.seed(
+                    products=options["products"],
+                    comments=options["comments"],
+                    orders=options["orders"],
+                    carts=options["carts"],
+                    offer_ads=options["offer_ads"],
+                    categories=options["categories"],
+                    users=options["users"],
+                    days=options["days"],
+                    seed=options["seed"],
+                    chunk_size=options["chunk_size"],
+                    index=not options["no_index"],
+                    report=report,
+                )
+        finally:
+            if options["fast"]:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"PRAGMA synchronous={int(synchronous)}")
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {time.perf_counter() - started:.1f}s."))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Checkpoint the SQLite write-ahead log back into the database file and "
+        "run PRAGMA optimize. Schedule it periodically (e.g. hourly) when the "
+        "database runs in WAL mode."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--mode", default="TRUNCATE", choices=["PASSIVE", "FULL", "RESTART", "TRUNCATE"],
+            help="wal_checkpoint mode (default TRUNCATE: also shrinks the -wal file). "
+                 "PASSIVE never waits for readers or writers.",
+        )
+        parser.add_argument("--no-optimize", action="store_true", help="Only checkpoint.")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "sqlite":
+            raise CommandError("This command is SQLite-specific.")
+
+        with connection.cursor() as cursor:
+            journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+            if journal_mode.lower() != "wal":
+                self.stdout.write(f"journal_mode is {journal_mode}: nothing to checkpoint.")
+            else:
+                # (busy, frames in the log, frames checkpointed); busy=1 means
+                # a reader or writer kept part of the log from being copied
+                busy, log, done = cursor.execute(
+                    f"PRAGMA wal_checkpoint({options['mode']})"
+                ).fetchone()
+                self.stdout.write(
+                    f"wal_checkpoint({options['mode']}): {done}/{log} frames checkpointed"
+                    + (", blocked by an active connection" if busy else "")
+                )
+
+            if not options["no_optimize"]:
+                cursor.execute("PRAGMA optimize")
+                self.stdout.write("optimize: done")
+
+        self.stdout.write(self.style.SUCCESS("SQLite maintenance finished."))
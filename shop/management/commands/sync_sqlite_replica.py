@@ -0,0 +1,33 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from shop import db_router
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into the SQLite file configured as "
+        "DATABASE_REPLICA_URL, to stand in for replication when testing the "
+        "read-replica router locally."
+    )
+
+    def handle(self, *args, **options):
+        if not db_router.enabled():
+            raise CommandError("No 'replica' database: set DATABASE_REPLICA_URL.")
+        primary, replica = connections["default"], connections[db_router.REPLICA]
+        if primary.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError("Both databases must be SQLite; use real replication otherwise.")
+        if str(primary.settings_dict["NAME"]) == str(replica.settings_dict["NAME"]):
+            raise CommandError("Primary and replica point at the same file.")
+
+        # Online backup: consistent even while the primary is in use
+        replica.close()
+        primary.ensure_connection()
+        target = sqlite3.connect(replica.settings_dict["NAME"])
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        self.stdout.write(self.style.SUCCESS(f"Copied primary to {replica.settings_dict['NAME']}."))
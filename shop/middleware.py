@@ -0,0 +1,152 @@
+# shop/middleware.py
+
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import categories, db_router, perf
+from .cart import CART_AGE, COOKIE_NAME, COOKIE_SALT
+
+
+perf_logger = logging.getLogger("shop.perf")
+
+
+class CartCookieMiddleware:
+    # Sends the signed cart-id cookie the first time a cache-backed cart
+    # (shop/cart.py) is written to. No-op for the CartItem backend.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        cart = getattr(request, "_shop_cart", None)
+        if cart is not None and getattr(cart, "new_cookie", False):
+            response.set_signed_cookie(
+                COOKIE_NAME,
+                cart.cart_id,
+                salt=COOKIE_SALT,
+                max_age=CART_AGE,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class CategoryVersionMiddleware:
+    # Reads the category version token (shop/categories.py) from the shared
+    # cache at most once per request.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = categories.start()
+        try:
+            return self.get_response(request)
+        finally:
+            categories.stop(token)
+
+
+class PerformanceMiddleware:
+    # Server-Timing for a sample of requests: SQL count/time, template time,
+    # the rest of the view, and repeated SQL shapes (N+1 candidates).
+    #
+    #   SHOP_PERF_SAMPLE_RATE    fraction of requests measured
+    #                            (default: all with DEBUG, 5% otherwise)
+    #   SHOP_PERF_LOG            also write one JSON line per sampled request
+    #                            to the "shop.perf" logger
+    #   SHOP_PERF_REPEAT_THRESHOLD  runs of one SQL shape that count as N+1
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(
+            settings, "SHOP_PERF_SAMPLE_RATE", 1.0 if settings.DEBUG else 0.05
+        )
+        self.log = getattr(settings, "SHOP_PERF_LOG", False)
+        self.repeat_threshold = getattr(settings, "SHOP_PERF_REPEAT_THRESHOLD", 5)
+        perf.install_template_timing()
+
+    def __call__(self, request):
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        stats, token = perf.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(perf.sql_wrapper))
+                response = self.get_response(request)
+        finally:
+            perf.stop(token)
+
+        total = time.perf_counter() - stats.started
+        view = max(total - stats.db_time - stats.template_time, 0)
+        repeated = stats.repeated(self.repeat_threshold)
+        worst = repeated[0][0] if repeated else 0
+
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+            f"tpl;dur={stats.template_time * 1000:.1f}",
+            f"view;dur={view * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+            f'sql-repeat;desc="{len(repeated)} shapes, max {worst}x"',
+        ])
+
+        if self.log:
+            perf_logger.info(json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "total_ms": round(total * 1000, 1),
+                "view_ms": round(view * 1000, 1),
+                "db_ms": round(stats.db_time * 1000, 1),
+                "template_ms": round(stats.template_time * 1000, 1),
+                "queries": stats.queries,
+                "repeated": [
+                    {"count": count, "sql": shape[:200]}
+                    for count, shape in repeated
+                ],
+            }))
+        return response
+
+
+class ReplicaMiddleware:
+    # Lets safe requests read the catalog from the "replica" database
+    # (shop/db_router.py). Requests that write, and the same browser for
+    # SHOP_REPLICA_PIN_SECONDS afterwards, read from the primary.
+
+    COOKIE_NAME = "shop_primary"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, "SHOP_REPLICA_PIN_SECONDS", 5)
+
+    def __call__(self, request):
+        if not db_router.enabled():
+            return self.get_response(request)
+
+        safe = request.method in ("GET", "HEAD", "OPTIONS")
+        state, token = db_router.start(pinned=not safe or self.COOKIE_NAME in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            db_router.stop(token)
+
+        if state.wrote and self.pin_seconds:
+            response.set_cookie(
+                self.COOKIE_NAME,
+                "1",
+                max_age=self.pin_seconds,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_product_fts(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return  # non-SQLite: use `manage.py rebuild_search_index` (inverted index)
+
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                "CREATE VIRTUAL TABLE shop_product_fts USING fts5("
+                "name, description, category, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        except Exception:
+            return  # SQLite built without FTS5
+
+        cursor.execute(
+            "CREATE VIRTUAL TABLE shop_product_fts_vocab "
+            "USING fts5vocab(shop_product_fts, 'row')"
+        )
+        cursor.execute(
+            "INSERT INTO shop_product_fts (rowid, name, description, category) "
+            "SELECT p.id, p.name, p.description, c.name "
+            "FROM shop_product p JOIN shop_category c ON c.id = p.category_id"
+        )
+
+
+def drop_product_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS shop_product_fts_vocab")
+        cursor.execute("DROP TABLE IF EXISTS shop_product_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0016_alter_productcomment_options_productcomment_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('field', models.CharField(choices=[('name', 'Name'), ('description', 'Description'), ('category', 'Category')], max_length=12)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='shop.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'product'], name='shop_search_token_773dae_idx')],
+            },
+        ),
+        migrations.RunPython(create_product_fts, drop_product_fts),
+    ]
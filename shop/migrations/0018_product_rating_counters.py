@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:25
+
+from django.db import migrations, models
+
+
+def backfill_rating_counters(apps, schema_editor):
+    Product = apps.get_model('shop', 'Product')
+    ProductComment = apps.get_model('shop', 'ProductComment')
+
+    counters = {}
+    rows = (
+        ProductComment.objects.values('product_id', 'rating')
+        .annotate(n=models.Count('id'))
+        .values_list('product_id', 'rating', 'n')
+        .order_by()
+    )
+    for product_id, rating, n in rows:
+        star = min(max(rating, 1), 5)
+        c = counters.setdefault(product_id, {'rating_count': 0, 'rating_sum': 0})
+        c[f'rating_{star}'] = c.get(f'rating_{star}', 0) + n
+        c['rating_count'] += n
+        c['rating_sum'] += n * star
+
+    for product_id, c in counters.items():
+        c['rating_avg'] = c['rating_sum'] / c['rating_count']
+        Product.objects.filter(pk=product_id).update(**c)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0017_searchtoken_product_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_avg',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0019_orderstatusevent_outboxcursor'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['session_key', 'product', 'size'], name='shop_cart_sess_prod_size_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='shop_order_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('available', True)), fields=['created_at', 'id'], name='shop_prod_avail_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('available', True), ('is_on_offer', True), ('offer_price__isnull', False)), fields=['offer_price', 'id'], name='shop_prod_avail_offer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('available', True)), fields=['category', 'created_at', 'id'], name='shop_prod_cat_avail_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productcomment',
+            index=models.Index(fields=['product', 'created_at'], name='shop_comment_prod_created_idx'),
+        ),
+    ]
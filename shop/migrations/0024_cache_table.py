@@ -0,0 +1,12 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Created the DatabaseCache table while that was the default cache;
+    # the cache now lives outside the database (CACHE_URL in settings)
+
+    dependencies = [
+        ('shop', '0023_cart_load_index'),
+    ]
+
+    operations = []
@@ -1,5 +1,5 @@
 from decimal import Decimal
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.conf import settings
@@ -24,6 +24,48 @@ class Category(models.Model):
 
 # ================= PRODUCT =================
 
+# Fields that decide Product.get_display_price()
+PRICE_FIELDS = {'price', 'offer_price', 'is_on_offer'}
+
+# Fields shown in the cached quick-view fragment (shop/quick_view.py)
+QUICK_VIEW_FIELDS = PRICE_FIELDS | {
+    'name', 'slug', 'description', 'image', 'available', 'category', 'category_id',
+}
+
+
+class ProductQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # Bulk edits skip the post_save signals: drop the changed products'
+        # quick-view fragments here, once the update has committed
+        slugs = None
+        if not QUICK_VIEW_FIELDS.isdisjoint(kwargs):
+            slugs = list(self.values_list('slug', flat=True))
+
+        rows = self._update_with_price_log(**kwargs)
+
+        if slugs:
+            from . import quick_view
+            transaction.on_commit(lambda: quick_view.invalidate(*slugs), using=self.db)
+        return rows
+
+    def _update_with_price_log(self, **kwargs):
+        # Bulk price edits are logged to ProductPriceChange like single
+        # saves (shop/signals.py), so price-drop alerts see them too
+        if PRICE_FIELDS.isdisjoint(kwargs):
+            return super().update(**kwargs)
+
+        with transaction.atomic(using=self.db):
+            fields = ('id', 'price', 'offer_price', 'is_on_offer')
+            before = {p.id: p.get_display_price() for p in self.only(*fields)}
+            rows = super().update(**kwargs)
+            ProductPriceChange.objects.bulk_create([
+                ProductPriceChange(product=p, old_price=before[p.id], new_price=p.get_display_price())
+                for p in Product.objects.filter(id__in=before).only(*fields)
+                if p.get_display_price() != before[p.id]
+            ])
+        return rows
+
+
 class Product(models.Model):
     category = models.ForeignKey(Category, related_name='products', on_delete=models.CASCADE)
     name = models.CharField(max_length=200)
@@ -37,8 +79,52 @@ class Product(models.Model):
     is_on_offer = models.BooleanField(default=False)
     offer_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
 
+    # ⭐ Rating counters, maintained by ProductComment writes (shop/ratings.py)
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_avg = models.FloatField(default=0, editable=False)
+
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         ordering = ('-created_at',)
+        # Catalog listings: keyset pages ordered by (sort field, id).
+        # Partial on `available`: SQLite filters booleans as a bare
+        # `WHERE available`, which a leading index column can't serve.
+        indexes = [
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(available=True),
+                name='shop_prod_avail_created_idx',
+            ),
+            models.Index(
+                fields=['offer_price', 'id'],
+                condition=models.Q(available=True, is_on_offer=True, offer_price__isnull=False),
+                name='shop_prod_avail_offer_idx',
+            ),
+            models.Index(
+                fields=['category', 'created_at', 'id'],
+                condition=models.Q(available=True),
+                name='shop_prod_cat_avail_idx',
+            ),
+            # price_asc / price_desc and rating sorts (walked backwards
+            # for descending orders)
+            models.Index(
+                fields=['price', 'id'],
+                condition=models.Q(available=True),
+                name='shop_prod_avail_price_idx',
+            ),
+            models.Index(
+                fields=['rating_avg', 'id'],
+                condition=models.Q(available=True),
+                name='shop_prod_avail_rating_idx',
+            ),
+        ]
 
     def str(self):
         return self.name
@@ -57,6 +143,17 @@ class Product(models.Model):
             return None
         return int(((self.price - self.offer_price) / self.price) * Decimal('100'))
 
+    def rating_rows(self):
+        rows = []
+        for star in range(5, 0, -1):
+            count = getattr(self, f"rating_{star}")
+            rows.append({
+                "star": star,
+                "count": count,
+                "percent": (count / self.rating_count) * 100 if self.rating_count else 0,
+            })
+        return rows
+
 
 # ================= CART ITEM =================
 
@@ -70,6 +167,14 @@ class CartItem(models.Model):
 
     added_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Cart add (get_or_create)
+            models.Index(fields=['session_key', 'product', 'size'], name='shop_cart_sess_prod_size_idx'),
+            # Per-session cart load, in the order lines were added
+            models.Index(fields=['session_key', 'added_at', 'id'], name='shop_cart_sess_added_idx'),
+        ]
+
     # ✅ ADD THIS
     @property
     def total_price(self):
@@ -143,10 +248,44 @@ class Order(models.Model):
     default='PENDING'
 )
 
+    class Meta:
+        # Order history pages
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='shop_order_user_created_idx'),
+        ]
+
     def str(self):
         return f"Order #{self.id}"
 
 
+# ================= ORDER STATUS HISTORY =================
+# Append-only: one row per status change, written in the same transaction
+# as the change (shop/order_states.py). Read incrementally via shop/outbox.py.
+
+class OrderStatusEvent(models.Model):
+    order = models.ForeignKey(Order, related_name='status_events', on_delete=models.CASCADE)
+    transition = models.CharField(max_length=30)
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    refund_status = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('id',)
+
+    def __str__(self):
+        return f"Order #{self.order_id}: {self.from_status or '∅'} → {self.to_status}"
+
+
+class OutboxCursor(models.Model):
+    consumer = models.CharField(max_length=100, unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.consumer} @ {self.last_event_id}"
+
+
 # ================= ORDER ITEM =================
 
 class OrderItem(models.Model):
@@ -186,10 +325,38 @@ class PriceDropAlert(models.Model):
     is_triggered = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Open alerts per product (shop/price_alerts.py)
+        indexes = [
+            models.Index(
+                fields=['product'],
+                condition=models.Q(is_triggered=False),
+                name='shop_alert_open_product_idx',
+            ),
+        ]
+
     def str(self):
         return f"Price alert for {self.product.name}"
 
 
+# ================= PRICE CHANGE LOG =================
+# Append-only: one row per change of a product's display price, from
+# admin saves and bulk queryset updates alike. Read incrementally by the
+# price-drop alert evaluator through shop/outbox.py.
+
+class ProductPriceChange(models.Model):
+    product = models.ForeignKey(Product, related_name='price_changes', on_delete=models.CASCADE)
+    old_price = models.DecimalField(max_digits=10, decimal_places=2)
+    new_price = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('id',)
+
+    def __str__(self):
+        return f"{self.product_id}: {self.old_price} → {self.new_price}"
+
+
 # ================= OFFER ADS =================
 
 class OfferAd(models.Model):
@@ -223,6 +390,31 @@ class ProductComment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', 'created_at'], name='shop_comment_prod_created_idx'),
+        ]
 
     def str(self):
-        return f"{self.user} - {self.product.name}"
\ No newline at end of file
+        return f"{self.user} - {self.product.name}"
+
+# ================= SEARCH INDEX =================
+# Fallback inverted index used when SQLite FTS5 is not available
+# (see shop/search.py). One row per (product, field, token).
+
+class SearchToken(models.Model):
+    FIELD_CHOICES = (
+        ('name', 'Name'),
+        ('description', 'Description'),
+        ('category', 'Category'),
+    )
+
+    token = models.CharField(max_length=64)
+    product = models.ForeignKey(Product, related_name='search_tokens', on_delete=models.CASCADE)
+    field = models.CharField(max_length=12, choices=FIELD_CHOICES)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [models.Index(fields=['token', 'product'])]
+
+    def __str__(self):
+        return f"{self.token} → {self.product_id} ({self.field})"
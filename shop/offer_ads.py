@@ -0,0 +1,63 @@
+# shop/offer_ads.py
+#
+# Cache of the currently active OfferAds. The active set only changes when
+# an admin edits an ad (signals call `invalidate()`) or when some ad's
+# start_date / end_date passes, so the cached set is stored together with
+# the next such boundary and is recomputed the moment it is reached.
+
+import math
+
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from . import db_router
+from .models import OfferAd
+
+
+CACHE_KEY = "shop:offer_ads:active"
+
+
+def _load(now):
+    ads = list(
+        OfferAd.objects.filter(
+            is_active=True,
+            start_date__lte=now,
+            end_date__gte=now
+        ).order_by('-created_at')
+    )
+
+    next_start = OfferAd.objects.filter(
+        is_active=True,
+        start_date__gt=now
+    ).aggregate(next=Min('start_date'))['next']
+
+    boundaries = [ad.end_date for ad in ads]
+    if next_start:
+        boundaries.append(next_start)
+    return ads, min(boundaries, default=None)
+
+
+def active_offer_ads():
+    now = timezone.now()
+
+    cached = cache.get(CACHE_KEY)
+    if cached is not None:
+        ads, boundary = cached
+        if boundary is None or now < boundary:
+            return ads
+
+    with db_router.primary():
+        ads, boundary = _load(now)
+
+    # The boundary check above is exact; the cache timeout only lets the
+    # backend drop the entry around the same time.
+    timeout = None
+    if boundary is not None:
+        timeout = max(1, math.ceil((boundary - now).total_seconds()))
+    cache.set(CACHE_KEY, (ads, boundary), timeout)
+    return ads
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
@@ -0,0 +1,109 @@
+# shop/order_states.py
+#
+# Order state machine. Every allowed status change is declared once here
+# and applied as a single filtered UPDATE:
+#
+#   UPDATE shop_order SET order_status = <target>, ...
+#   WHERE <selection> AND order_status IN (<sources>)
+#
+# so bulk admin actions don't loop over rows, and concurrent requests
+# can't move an order out of a state it has already left. Each change also
+# appends an OrderStatusEvent in the same transaction.
+
+from collections import namedtuple
+
+from django.db import transaction
+
+from .db import lock_for_update
+from .models import Order, OrderStatusEvent
+
+
+CHUNK_SIZE = 500  # keeps `id IN (...)` under SQLite's parameter limit
+
+
+Transition = namedtuple("Transition", ["sources", "target", "fields"])
+
+TRANSITIONS = {
+    # admin
+    "ship": Transition(("PENDING",), "SHIPPED", {}),
+    "complete": Transition(("SHIPPED",), "COMPLETED", {"paid": True}),
+    "approve_return": Transition(
+        ("RETURN_REQUESTED",), "RETURNED",
+        {"refund_status": "REFUNDED", "paid": False},
+    ),
+    "reject_return": Transition(
+        ("RETURN_REQUESTED",), "COMPLETED",
+        {"refund_status": "NOT_REFUNDED"},
+    ),
+    # refund_status stays NOT_REFUNDED, paid stays True
+    "approve_exchange": Transition(("EXCHANGE_REQUESTED",), "EXCHANGED", {}),
+
+    # customer
+    "cancel": Transition(("PENDING",), "CANCELLED", {}),
+    "request_return": Transition(
+        ("COMPLETED",), "RETURN_REQUESTED",
+        {"refund_status": "REFUND_PENDING"},
+    ),
+    "request_exchange": Transition(("COMPLETED",), "EXCHANGE_REQUESTED", {}),
+}
+
+# Every state used above must be a real Order status
+_STATUSES = {code for code, _ in Order.STATUS_CHOICES}
+for _name, _t in TRANSITIONS.items():
+    if not set(_t.sources) | {_t.target} <= _STATUSES:
+        raise ValueError(f"Transition {_name!r} uses an unknown order status")
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+def apply(queryset, name, **fields):
+    # Returns the number of orders that actually changed state.
+    # `fields` carries per-call data such as return_reason.
+    try:
+        transition = TRANSITIONS[name]
+    except KeyError:
+        raise InvalidTransition(f"Unknown order transition {name!r}")
+
+    values = {**transition.fields, **fields}
+
+    changed = 0
+    with transaction.atomic():
+        candidates = lock_for_update(
+            queryset.filter(order_status__in=transition.sources),
+            "order_status",
+        )
+        rows = list(candidates.order_by().values_list("id", "order_status", "refund_status"))
+
+        for start in range(0, len(rows), CHUNK_SIZE):
+            chunk = rows[start:start + CHUNK_SIZE]
+            changed += Order.objects.filter(
+                id__in=[pk for pk, _, _ in chunk],
+                order_status__in=transition.sources,
+            ).update(order_status=transition.target, **values)
+
+            OrderStatusEvent.objects.bulk_create([
+                OrderStatusEvent(
+                    order_id=pk,
+                    transition=name,
+                    from_status=status,
+                    to_status=transition.target,
+                    # Transitions that don't set it keep the order's own
+                    refund_status=values.get("refund_status", refund_status),
+                )
+                for pk, status, refund_status in chunk
+            ])
+
+    return changed
+
+
+def apply_one(order, name, **fields):
+    # Single-order variant for customer views; keeps `order` in sync.
+    changed = apply(Order.objects.filter(pk=order.pk), name, **fields)
+    if changed:
+        transition = TRANSITIONS[name]
+        order.order_status = transition.target
+        for field, value in {**transition.fields, **fields}.items():
+            setattr(order, field, value)
+    return bool(changed)
@@ -0,0 +1,53 @@
+# shop/orders.py
+#
+# Order history helpers shared by user_orders, return_order and
+# exchange_order.
+
+from datetime import timedelta
+
+from django.db.models import BooleanField, Case, IntegerField, Prefetch, Q, Value, When
+from django.utils import timezone
+
+from .models import Order, OrderItem
+
+
+RETURN_WINDOW_DAYS = 7
+ORDERS_PER_PAGE = 10
+
+
+def with_return_window(queryset, now=None):
+    # Annotates `can_return` and `return_days_left` in SQL.
+    # days left = floor((created_at + window - now) / 1 day), minimum 1,
+    # which is just a ladder of created_at comparisons against `now`.
+    now = now or timezone.now()
+    eligible = Q(
+        order_status='COMPLETED',
+        created_at__gte=now - timedelta(days=RETURN_WINDOW_DAYS),
+    )
+
+    days_left = [
+        When(eligible & Q(created_at__gte=now - timedelta(days=RETURN_WINDOW_DAYS - days)), then=Value(days))
+        for days in range(RETURN_WINDOW_DAYS - 1, 1, -1)
+    ]
+
+    return queryset.annotate(
+        can_return=Case(
+            When(eligible, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        ),
+        return_days_left=Case(
+            *days_left,
+            When(eligible, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+    )
+
+
+def order_history(user):
+    return with_return_window(
+        Order.objects.filter(user=user)
+    ).prefetch_related(
+        Prefetch('items', queryset=OrderItem.objects.select_related('product'))
+    )
@@ -0,0 +1,76 @@
+# shop/outbox.py
+#
+# Batched reader over append-only event tables (OrderStatusEvent by
+# default, ProductPriceChange for price alerts). Each consumer has a
+# durable cursor (OutboxCursor.last_event_id); a batch is handed to
+# the consumer and the cursor advanced in one transaction, so a crash
+# re-delivers the batch instead of skipping it. Work is O(new events).
+#
+# Event ids are assigned in commit order on SQLite (single writer). On
+# databases with concurrent writers, run consumers with some lag.
+
+import logging
+
+from django.db import transaction
+
+from .models import OrderStatusEvent, OutboxCursor
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def _events(events):
+    if events is None:
+        return OrderStatusEvent.objects.select_related("order")
+    return events
+
+
+def pending(consumer, events=None):
+    cursor = OutboxCursor.objects.filter(consumer=consumer).first()
+    last_id = cursor.last_event_id if cursor else 0
+    return _events(events).filter(id__gt=last_id).count()
+
+
+def process(consumer, handler, batch_size=BATCH_SIZE, max_batches=None, events=None):
+    # handler(events) gets a list of events: OrderStatusEvent (with .order
+    # loaded) unless another `events` queryset is given.
+    # Returns the number of events delivered.
+    OutboxCursor.objects.get_or_create(consumer=consumer)
+
+    delivered = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            cursor = OutboxCursor.objects.select_for_update().get(consumer=consumer)
+            batch = list(
+                _events(events).filter(id__gt=cursor.last_event_id)
+                .order_by("id")[:batch_size]
+            )
+            if not batch:
+                break
+
+            handler(batch)
+
+            cursor.last_event_id = batch[-1].id
+            cursor.save(update_fields=["last_event_id", "updated_at"])
+
+        delivered += len(batch)
+        batches += 1
+    return delivered
+
+
+def reset(consumer, last_event_id=0):
+    OutboxCursor.objects.update_or_create(
+        consumer=consumer, defaults={"last_event_id": last_event_id}
+    )
+
+
+def log_events(events):
+    # Built-in consumer: one log line per event
+    for event in events:
+        logger.info(
+            "order %s %s: %s -> %s",
+            event.order_id, event.transition, event.from_status or "-", event.to_status,
+        )
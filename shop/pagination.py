@@ -0,0 +1,132 @@
+# shop/pagination.py
+#
+# Keyset (cursor) pagination. Each page is fetched with
+# `WHERE (sort_key, id) > (last_sort_key, last_id) LIMIT n`, so page N
+# costs the same as page 1. The cursor is the signed (value, id) pair of
+# the last row on the previous page.
+#
+# Search results ordered by relevance have no column to seek on: their
+# order is the ranked id list from shop/search.py, and the cursor is a
+# position in that list (paginate_ranked).
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+PAGE_SIZE = getattr(settings, "SHOP_PAGE_SIZE", 24)
+CURSOR_SALT = "shop.pagination.cursor"
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _split(ordering):
+    if ordering.startswith("-"):
+        return ordering[1:], True
+    return ordering, False
+
+
+def _to_python(model, field_name, value):
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return int(value)  # integer annotations
+    return field.to_python(value)
+
+
+def encode_cursor(ordering, obj):
+    field_name, _ = _split(ordering)
+    value = getattr(obj, field_name)
+    return signing.dumps(
+        [ordering, None if value is None else str(value), obj.pk],
+        salt=CURSOR_SALT,
+        compress=True,
+    )
+
+
+def decode_cursor(cursor, ordering, model):
+    if not cursor:
+        return None
+    try:
+        cursor_ordering, value, pk = signing.loads(cursor, salt=CURSOR_SALT)
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+    # A cursor from another sort order is meaningless here: restart
+    if cursor_ordering != ordering or value is None:
+        return None
+    field_name, _ = _split(ordering)
+    try:
+        return _to_python(model, field_name, value), int(pk)
+    except (ValidationError, ValueError, TypeError):
+        return None
+
+
+def paginate(queryset, ordering, cursor=None, per_page=PAGE_SIZE):
+    field_name, descending = _split(ordering)
+    tie_break = "-id" if descending else "id"
+    queryset = queryset.order_by(ordering, tie_break)
+
+    position = decode_cursor(cursor, ordering, queryset.model)
+    if position is not None:
+        value, pk = position
+        if descending:
+            queryset = queryset.filter(
+                Q(**{f"{field_name}__lt": value}) |
+                Q(**{field_name: value, "id__lt": pk})
+            )
+        else:
+            queryset = queryset.filter(
+                Q(**{f"{field_name}__gt": value}) |
+                Q(**{field_name: value, "id__gt": pk})
+            )
+
+    rows = list(queryset[:per_page + 1])
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        next_cursor = encode_cursor(ordering, items[-1])
+    return KeysetPage(items, next_cursor)
+
+
+def paginate_ranked(queryset, ids, cursor=None, per_page=PAGE_SIZE):
+    # `ids` in display order; `queryset` may still drop some of them
+    # (availability, category), so ids are read in growing slices until a
+    # page is full. Only the rows on the page are fetched.
+    try:
+        kind, start = signing.loads(cursor, salt=CURSOR_SALT) if cursor else ("ranked", 0)
+        start = int(start) if kind == "ranked" else 0
+    except (signing.BadSignature, ValueError, TypeError):
+        start = 0
+
+    queryset = queryset.order_by()  # the page is ordered by `ids`
+    items, positions = [], []
+    position, batch = max(start, 0), per_page + 1
+    while len(items) <= per_page and position < len(ids):
+        chunk = ids[position:position + batch]
+        found = queryset.in_bulk(chunk)
+        for offset, pk in enumerate(chunk):
+            if pk in found:
+                items.append(found[pk])
+                positions.append(position + offset)
+        position += len(chunk)
+        batch *= 2
+
+    next_cursor = None
+    if len(items) > per_page:
+        next_cursor = signing.dumps(["ranked", positions[per_page - 1] + 1], salt=CURSOR_SALT)
+    return KeysetPage(items[:per_page], next_cursor)
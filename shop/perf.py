@@ -0,0 +1,95 @@
+# shop/perf.py
+#
+# Per-request performance counters for PerformanceMiddleware
+# (shop/middleware.py): SQL query count and time, template render time,
+# and repeated SQL "shapes". The same statement text run many times in
+# one request is the signature of an N+1 loop.
+#
+# Collection only happens for sampled requests. For the rest, the hooks
+# below cost one context variable lookup.
+
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.template.base import Template
+
+
+_current = ContextVar("shop_perf_stats", default=None)
+
+# "IN (%s, %s, %s)" -> "IN (...)": same shape whatever the list length
+_IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.shapes = Counter()
+
+    def repeated(self, threshold):
+        # [(count, sql shape)] for shapes run at least `threshold` times
+        return [
+            (count, shape)
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+def start():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    # connection.execute_wrapper() hook
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - started
+        stats.queries += 1
+        stats.shapes[_IN_LIST_RE.sub("IN (...)", sql)] += 1
+
+
+# ================= TEMPLATE TIMING =================
+# Template.render is wrapped once; includes nest inside their parent's
+# render, so only the outermost call is timed. Queries run while
+# rendering (lazy querysets, template tags) are already in db_time and are
+# left out of template_time, so tpl + db never counts the same time twice.
+
+_original_render = Template.render
+
+
+def _timed_render(self, context):
+    stats = _current.get()
+    if stats is None:
+        return _original_render(self, context)
+
+    stats.template_depth += 1
+    started, db_before = time.perf_counter(), stats.db_time
+    try:
+        return _original_render(self, context)
+    finally:
+        stats.template_depth -= 1
+        if not stats.template_depth:
+            stats.template_time += (
+                time.perf_counter() - started - (stats.db_time - db_before)
+            )
+
+
+def install_template_timing():
+    if Template.render is not _timed_render:
+        Template.render = _timed_render
@@ -0,0 +1,66 @@
+# shop/price_alerts.py
+#
+# Incremental price-drop alert evaluation. Every display-price change is
+# logged to ProductPriceChange; the evaluator walks that log through the
+# outbox cursor and, per batch, flips is_triggered with a single UPDATE on
+# the open alerts of just the products whose price went down. Work scales
+# with the number of price changes, not the number of alerts.
+
+from django.db.models import Case, F, Q, When
+
+from . import outbox
+from .cart import MONEY
+from .models import PriceDropAlert, ProductPriceChange
+
+
+CONSUMER = "price_drop_alerts"
+
+# Product.get_display_price(), from the alert's side
+CURRENT_PRICE = Case(
+    When(
+        Q(product__is_on_offer=True) & Q(product__offer_price__isnull=False),
+        then=F("product__offer_price"),
+    ),
+    default=F("product__price"),
+    output_field=MONEY,
+)
+
+
+def log_change(product, old_price):
+    new_price = product.get_display_price()
+    if old_price is not None and new_price != old_price:
+        ProductPriceChange.objects.create(product=product, old_price=old_price, new_price=new_price)
+
+
+def evaluate(changes):
+    # Compares against the *current* price, so a drop that was undone
+    # before the evaluator ran triggers nothing
+    dropped = {c.product_id for c in changes if c.new_price < c.old_price}
+    if not dropped:
+        return 0
+    return PriceDropAlert.objects.filter(
+        product_id__in=dropped,
+        is_triggered=False,
+        old_price__gt=CURRENT_PRICE,
+    ).update(is_triggered=True)
+
+
+def run(batch_size=outbox.BATCH_SIZE, max_batches=None):
+    # Returns (changes read, alerts triggered)
+    triggered = []
+
+    def handler(changes):
+        triggered.append(evaluate(changes))
+
+    read = outbox.process(
+        CONSUMER,
+        handler,
+        batch_size=batch_size,
+        max_batches=max_batches,
+        events=ProductPriceChange.objects.all(),
+    )
+    return read, sum(triggered)
+
+
+def pending():
+    return outbox.pending(CONSUMER, events=ProductPriceChange.objects.all())
@@ -0,0 +1,106 @@
+# shop/purge.py
+#
+# Purge of abandoned anonymous data. CartItem, Wishlist and PriceDropAlert
+# rows keyed by a session_key whose session is gone or expired (and that
+# belong to no user) are deleted once they are older than the cutoff,
+# followed by the expired django_session rows themselves.
+#
+# Every DELETE covers one bounded id range (or one batch of session keys)
+# in its own short transaction, so the purge can run under live traffic
+# without holding the SQLite write lock for long.
+
+import time
+from datetime import timedelta
+
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.db.models import Exists, Max, Min, OuterRef
+from django.utils import timezone
+
+from .models import CartItem, PriceDropAlert, Wishlist
+
+
+CHUNK_SIZE = 1000
+
+# (model, timestamp field, user-owned rows are kept)
+TARGETS = [
+    (CartItem, "added_at", False),
+    (Wishlist, "added_at", True),
+    (PriceDropAlert, "created_at", True),
+]
+
+
+def abandoned(model, date_field, has_user, cutoff, now):
+    live_session = Session.objects.filter(
+        session_key=OuterRef("session_key"),
+        expire_date__gte=now,
+    )
+    queryset = model.objects.filter(**{f"{date_field}__lt": cutoff}).filter(
+        ~Exists(live_session)
+    )
+    if has_user:
+        queryset = queryset.filter(user__isnull=True)
+    return queryset
+
+
+def purge_rows(queryset, chunk_size=CHUNK_SIZE, dry_run=False, sleep=0):
+    # Walk the table's id range in windows of chunk_size. Returns rows purged.
+    bounds = queryset.model.objects.aggregate(lo=Min("id"), hi=Max("id"))
+    if bounds["lo"] is None:
+        return 0
+
+    total = 0
+    for start in range(bounds["lo"], bounds["hi"] + 1, chunk_size):
+        window = queryset.filter(id__gte=start, id__lt=start + chunk_size)
+        if dry_run:
+            total += window.count()
+            continue
+        with transaction.atomic():
+            deleted, _ = window.delete()
+        total += deleted
+        if deleted and sleep:
+            time.sleep(sleep)
+    return total
+
+
+def purge_sessions(now, chunk_size=CHUNK_SIZE, dry_run=False, sleep=0):
+    expired = Session.objects.filter(expire_date__lt=now)
+    if dry_run:
+        return expired.count()
+
+    total = 0
+    while True:
+        keys = list(expired.values_list("session_key", flat=True)[:chunk_size])
+        if not keys:
+            return total
+        with transaction.atomic():
+            deleted, _ = Session.objects.filter(session_key__in=keys).delete()
+        total += deleted
+        if sleep:
+            time.sleep(sleep)
+
+
+def purge(days=30, chunk_size=CHUNK_SIZE, dry_run=False, sleep=0, report=None):
+    # report(label, rows, seconds) is called after each table
+    now = timezone.now()
+    cutoff = now - timedelta(days=days)
+    results = {}
+
+    for model, date_field, has_user in TARGETS:
+        started = time.perf_counter()
+        rows = purge_rows(
+            abandoned(model, date_field, has_user, cutoff, now),
+            chunk_size=chunk_size,
+            dry_run=dry_run,
+            sleep=sleep,
+        )
+        results[model._meta.label] = (rows, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    rows = purge_sessions(now, chunk_size=chunk_size, dry_run=dry_run, sleep=sleep)
+    results[Session._meta.label] = (rows, time.perf_counter() - started)
+
+    if report:
+        for label, (rows, seconds) in results.items():
+            report(label, rows, seconds)
+    return results
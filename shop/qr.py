@@ -0,0 +1,73 @@
+# shop/qr.py
+#
+# UPI QR rendering with a bounded in-process LRU cache. There are only
+# three apps and a handful of common amounts, so the same image is asked
+# for over and over. Amounts are normalized ("500" == "500.00") before
+# they become part of the cache key.
+
+import hashlib
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from io import BytesIO
+
+import qrcode
+import qrcode.image.svg
+from django.conf import settings
+
+
+CACHE_SIZE = getattr(settings, "SHOP_UPI_QR_CACHE_SIZE", 256)
+
+FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+def upi_account(app):
+    if app == "phonepe":
+        return settings.PHONEPE_UPI_ID, "PhonePe"
+    if app == "paytm":
+        return settings.PAYTM_UPI_ID, "Paytm"
+    return settings.GPAY_UPI_ID, "GPay"
+
+
+def normalize_app(app):
+    return app if app in ("phonepe", "paytm") else "gpay"
+
+
+def normalize_amount(amount):
+    try:
+        value = Decimal(str(amount).strip() or "0").quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {amount!r}")
+    if not value.is_finite() or value < 0:
+        raise ValueError(f"Invalid amount: {amount!r}")
+    return str(value)
+
+
+def upi_payload(app, amount):
+    upi_id, name = upi_account(app)
+    return (
+        f"upi://pay?"
+        f"pa={upi_id}&"
+        f"pn={name}&"
+        f"am={amount}&"
+        f"cu=INR"
+    )
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def render(app, amount, fmt="png"):
+    # app / amount must already be normalized. Returns (bytes, etag).
+    payload = upi_payload(app, amount)
+    buffer = BytesIO()
+
+    if fmt == "svg":
+        # Pure-Python SVG: no Pillow involved
+        qrcode.make(payload, image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    else:
+        qrcode.make(payload).save(buffer, format="PNG")
+
+    data = buffer.getvalue()
+    etag = '"%s"' % hashlib.sha256(data).hexdigest()[:32]
+    return data, etag
@@ -0,0 +1,79 @@
+# shop/quick_view.py
+#
+# Cached quick-view fragments. `_product_quick.html` is rendered once per
+# product and kept in the Django cache under the product slug plus the
+# category version token (the fragment shows the category name), so a
+# category rename retires every fragment at once and a product save
+# (signals) drops just that product's entry. `fragments()` serves many
+# slugs with one cache round trip and at most one query for the misses.
+#
+# The cached HTML is shared between visitors, so the form's CSRF token is
+# rendered as a placeholder and filled in per request by `personalize()`.
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+
+from . import categories, db_router, images
+from .models import Product
+
+
+TIMEOUT = getattr(settings, "SHOP_QUICK_VIEW_TIMEOUT", 60 * 60 * 24)
+MAX_BATCH = getattr(settings, "SHOP_QUICK_VIEW_BATCH", 24)
+
+CSRF_PLACEHOLDER = "__shop_quick_csrf__"
+
+
+def _key(version, slug):
+    return f"shop:quick:{version}:{slug}"
+
+
+def render_fragment(product):
+    return render_to_string("shop/_product_quick.html", {
+        "product": product,
+        "csrf_token": CSRF_PLACEHOLDER,
+    })
+
+
+def fragments(slugs):
+    # {slug: html} for the available products among `slugs` (first MAX_BATCH)
+    slugs = list(dict.fromkeys(slugs))[:MAX_BATCH]
+    if not slugs:
+        return {}
+
+    version = categories.version()
+    keys = {_key(version, slug): slug for slug in slugs}
+    found = {keys[key]: html for key, html in cache.get_many(list(keys)).items()}
+
+    missing = [slug for slug in slugs if slug not in found]
+    if missing:
+        to_cache = {}
+        with db_router.primary():
+            products = list(
+                Product.objects
+                .filter(slug__in=missing, available=True)
+                .select_related("category")
+            )
+        for product in products:
+            html = render_fragment(product)
+            found[product.slug] = html
+            # Until its variants exist the fragment links the original
+            # image; don't pin that version in the cache
+            if not product.image or images.has_variants(product.image.name):
+                to_cache[_key(version, product.slug)] = html
+        if to_cache:
+            cache.set_many(to_cache, TIMEOUT)
+
+    return {slug: found[slug] for slug in slugs if slug in found}
+
+
+def personalize(html, request):
+    return html.replace(CSRF_PLACEHOLDER, get_token(request))
+
+
+def invalidate(*slugs):
+    version = categories.version()
+    keys = [_key(version, slug) for slug in slugs if slug]
+    for start in range(0, len(keys), 500):  # bulk updates: bounded key lists
+        cache.delete_many(keys[start:start + 500])
@@ -0,0 +1,111 @@
+# shop/ratings.py
+#
+# Per-product rating counters. Product.rating_1..rating_5, rating_count,
+# rating_sum and rating_avg are updated with a single F() UPDATE whenever a
+# ProductComment is created or deleted, so product pages and listings never
+# aggregate over ProductComment. `reconcile` repairs any drift.
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from .models import Product, ProductComment
+
+
+STARS = range(1, 6)
+COUNTER_FIELDS = [f"rating_{star}" for star in STARS] + [
+    "rating_count",
+    "rating_sum",
+    "rating_avg",
+]
+
+
+def clamp(rating):
+    return min(max(int(rating), 1), 5)
+
+
+def apply(product_id, rating, delta):
+    star = clamp(rating)
+    count = F("rating_count") + delta
+    total = F("rating_sum") + delta * star
+
+    Product.objects.filter(pk=product_id).update(**{
+        f"rating_{star}": F(f"rating_{star}") + delta,
+        "rating_count": count,
+        "rating_sum": total,
+        "rating_avg": Coalesce(
+            Cast(total, FloatField()) / NullIf(count, Value(0)),
+            Value(0.0),
+        ),
+    })
+
+
+def _empty():
+    counters = {f"rating_{star}": 0 for star in STARS}
+    counters.update(rating_count=0, rating_sum=0, rating_avg=0.0)
+    return counters
+
+
+def counters_from_comments(product_ids):
+    counters = {pk: _empty() for pk in product_ids}
+    rows = (
+        ProductComment.objects.filter(product_id__in=product_ids)
+        .values("product_id", "rating")
+        .annotate(n=Count("id"))
+        .values_list("product_id", "rating", "n")
+        .order_by()
+    )
+    for product_id, rating, n in rows:
+        star = clamp(rating)
+        c = counters[product_id]
+        c[f"rating_{star}"] += n
+        c["rating_count"] += n
+        c["rating_sum"] += n * star
+
+    for c in counters.values():
+        if c["rating_count"]:
+            c["rating_avg"] = c["rating_sum"] / c["rating_count"]
+    return counters
+
+
+def recompute(product_ids):
+    product_ids = list(product_ids)
+    for pk, values in counters_from_comments(product_ids).items():
+        Product.objects.filter(pk=pk).update(**values)
+
+
+def reconcile(batch_size=500, dry_run=False):
+    # Returns the ids of products whose stored counters had drifted. Each
+    # batch commits on its own so a full run never holds the write lock
+    # (or a growing rollback journal) for the whole table.
+    drifted = []
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Product.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .select_for_update()
+                .only("id", *COUNTER_FIELDS)[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            expected = counters_from_comments([p.id for p in batch])
+            changed = []
+            for product in batch:
+                values = expected[product.id]
+                if any(
+                    abs(getattr(product, f) - values[f]) > 1e-9 if f == "rating_avg"
+                    else getattr(product, f) != values[f]
+                    for f in COUNTER_FIELDS
+                ):
+                    for f in COUNTER_FIELDS:
+                        setattr(product, f, values[f])
+                    changed.append(product)
+
+            drifted.extend(p.id for p in changed)
+            if changed and not dry_run:
+                Product.objects.bulk_update(changed, COUNTER_FIELDS)
+    return drifted
@@ -0,0 +1,375 @@
+# shop/search.py
+#
+# Product search index.
+#
+# On SQLite builds with FTS5 the catalog is mirrored into the
+# `shop_product_fts` virtual table (rowid = product id) and queried with
+# bm25 ranking. Everywhere else the `SearchToken` inverted index is used.
+# Both backends support prefix matching on the last query term and fall
+# back to trigram-based typo correction when a query matches nothing.
+
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, Sum
+from django.db.models.expressions import RawSQL
+
+from .models import Product, SearchToken
+
+
+FTS_TABLE = "shop_product_fts"
+FTS_VOCAB_TABLE = "shop_product_fts_vocab"
+
+# bm25 / inverted index weights per column
+FIELD_WEIGHTS = {
+    "name": 10,
+    "description": 1,
+    "category": 4,
+}
+FIELDS = tuple(FIELD_WEIGHTS)
+
+TRIGRAM_THRESHOLD = 0.3
+MAX_TOKEN_LENGTH = 64
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+# ================= TOKENIZING =================
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.lower()
+
+
+def tokenize(text):
+    return [t[:MAX_TOKEN_LENGTH] for t in _TOKEN_RE.findall(normalize(text))]
+
+
+def trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def _product_fields(name, description, category_name):
+    return {
+        "name": name or "",
+        "description": description or "",
+        "category": category_name or "",
+    }
+
+
+# ================= BACKEND SELECTION =================
+
+_fts_available = None
+
+
+def fts_available():
+    global _fts_available
+    if _fts_available is None:
+        if connection.vendor != "sqlite":
+            _fts_available = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name=%s",
+                    [FTS_TABLE],
+                )
+                _fts_available = cursor.fetchone() is not None
+    return _fts_available
+
+
+def reset_backend_cache():
+    global _fts_available
+    _fts_available = None
+
+
+def get_backend():
+    choice = getattr(settings, "SHOP_SEARCH_BACKEND", "auto")
+    if choice == "inverted" or (choice == "auto" and not fts_available()):
+        return InvertedIndexBackend()
+    return FTS5Backend()
+
+
+def sqlite_supports_fts5(conn):
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+            cursor.execute("DROP TABLE temp._fts5_probe")
+        except Exception:
+            return False
+    return True
+
+
+def create_fts_tables(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "name, description, category, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_VOCAB_TABLE} "
+            f"USING fts5vocab({FTS_TABLE}, 'row')"
+        )
+
+
+def drop_fts_tables(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_VOCAB_TABLE}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+# ================= FTS5 BACKEND =================
+
+class FTS5Backend:
+    name = "fts5"
+
+    def index(self, rows):
+        # rows: iterable of (id, name, description, category_name)
+        rows = list(rows)
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [(r[0],) for r in rows],
+            )
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, description, category) "
+                "VALUES (%s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove(self, product_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [(pk,) for pk in product_ids],
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    def optimize(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+    def _match_expression(self, tokens, fields):
+        terms = []
+        for i, token in enumerate(tokens):
+            term = '"%s"' % token.replace('"', '""')
+            if i == len(tokens) - 1:
+                term += "*"
+            terms.append(term)
+        expr = " AND ".join(terms)
+        if set(fields) != set(FIELDS):
+            expr = "{%s} : (%s)" % (" ".join(fields), expr)
+        return expr
+
+    def search(self, tokens, fields):
+        weights = ", ".join(
+            str(float(FIELD_WEIGHTS[f] if f in fields else 0)) for f in FIELDS
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, {weights})",
+                [self._match_expression(tokens, fields)],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def match_filter(self, tokens, fields, ids):
+        # Semi-join on the FTS rowid instead of shipping the id list
+        return Q(id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            [self._match_expression(tokens, fields)],
+        ))
+
+    def vocabulary(self, first_char):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT term FROM {FTS_VOCAB_TABLE} WHERE term >= %s AND term < %s",
+                [first_char, chr(ord(first_char) + 1)],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+# ================= INVERTED INDEX BACKEND =================
+
+class InvertedIndexBackend:
+    name = "inverted"
+
+    def index(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        SearchToken.objects.filter(product_id__in=[r[0] for r in rows]).delete()
+
+        tokens = []
+        for pk, name, description, category_name in rows:
+            values = _product_fields(name, description, category_name)
+            for field in FIELDS:
+                counts = defaultdict(int)
+                for token in tokenize(values[field]):
+                    counts[token] += 1
+                for token, count in counts.items():
+                    tokens.append(SearchToken(
+                        product_id=pk,
+                        token=token,
+                        field=field,
+                        weight=count * FIELD_WEIGHTS[field],
+                    ))
+        SearchToken.objects.bulk_create(tokens, batch_size=1000)
+
+    def remove(self, product_ids):
+        SearchToken.objects.filter(product_id__in=list(product_ids)).delete()
+
+    def clear(self):
+        SearchToken.objects.all().delete()
+
+    def optimize(self):
+        pass
+
+    def search(self, tokens, fields):
+        scores = None
+        for i, token in enumerate(tokens):
+            qs = SearchToken.objects.filter(field__in=fields)
+            if i == len(tokens) - 1:
+                # Range scan instead of LIKE so the token index is used
+                qs = qs.filter(token__gte=token, token__lt=token + "\uffff")
+            else:
+                qs = qs.filter(token=token)
+            if scores is not None:
+                qs = qs.filter(product_id__in=list(scores))
+
+            hits = dict(
+                qs.values("product_id")
+                .annotate(score=Sum("weight"))
+                .values_list("product_id", "score")
+            )
+            if scores is None:
+                scores = hits
+            else:
+                scores = {pk: scores[pk] + s for pk, s in hits.items() if pk in scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], -kv[0]))
+        return [pk for pk, _ in ranked]
+
+    def match_filter(self, tokens, fields, ids):
+        return Q(id__in=ids)
+
+    def vocabulary(self, first_char):
+        return list(
+            SearchToken.objects.filter(
+                token__gte=first_char,
+                token__lt=chr(ord(first_char) + 1),
+            ).values_list("token", flat=True).distinct()
+        )
+
+
+# ================= QUERYING =================
+
+def correct_tokens(backend, tokens):
+    corrected = []
+    changed = False
+    for token in tokens:
+        vocab = [
+            t for t in backend.vocabulary(token[0])
+            if abs(len(t) - len(token)) <= 2
+        ]
+        if token in vocab:
+            corrected.append(token)
+            continue
+        best, best_score = token, TRIGRAM_THRESHOLD
+        for term in vocab:
+            score = similarity(token, term)
+            if score > best_score:
+                best, best_score = term, score
+        changed = changed or best != token
+        corrected.append(best)
+    return corrected if changed else None
+
+
+def _search(q, fields):
+    # (backend, tokens, ids by relevance) after typo correction, or None
+    # when the query has no terms (e.g. "*")
+    tokens = tokenize(q)
+    if not tokens:
+        return None
+
+    backend = get_backend()
+    ids = backend.search(tokens, fields)
+    if not ids:
+        # Typo tolerance: retry once with trigram-corrected terms
+        corrected = correct_tokens(backend, tokens)
+        if corrected:
+            tokens, ids = corrected, backend.search(corrected, fields)
+    return backend, tokens, ids
+
+
+def search_ids(q, fields=FIELDS):
+    # Every matching product id, best first. Relevance-ordered pages are
+    # cut from this list by pagination.paginate_ranked().
+    result = _search(q, fields)
+    return None if result is None else result[2]
+
+
+def filter_queryset(queryset, q, fields=FIELDS):
+    # Matching products in no particular order, for explicit sorts. A query
+    # without any terms leaves the queryset unfiltered.
+    result = _search(q, fields)
+    if result is None:
+        return queryset
+    backend, tokens, ids = result
+    if not ids:
+        return queryset.none()
+    return queryset.filter(backend.match_filter(tokens, fields, ids))
+
+
+# ================= INDEX MAINTENANCE =================
+
+def _rows(queryset):
+    return queryset.values_list("id", "name", "description", "category__name")
+
+
+def index_products(queryset, batch_size=1000):
+    backend = get_backend()
+    ids = list(queryset.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(ids), batch_size):
+        backend.index(_rows(Product.objects.filter(id__in=ids[start:start + batch_size])))
+    return len(ids)
+
+
+def index_product(product):
+    get_backend().index([(
+        product.id,
+        product.name,
+        product.description,
+        product.category.name if product.category_id else "",
+    )])
+
+
+def remove_product(product_id):
+    get_backend().remove([product_id])
+
+
+def rebuild(batch_size=1000):
+    backend = get_backend()
+    backend.clear()
+    count = index_products(Product.objects.all(), batch_size=batch_size)
+    backend.optimize()
+    return backend.name, count
@@ -0,0 +1,357 @@
+# shop/seed.py
+#
+# Deterministic synthetic data for benchmarks and scale testing
+# (`manage.py seed_catalog`, `manage.py bench_storefront`). The same seed
+# always produces the same catalog, comments, orders, carts and offer ads.
+#
+# Rows are generated lazily and written with bulk_create, one chunk per
+# short transaction, so memory stays flat at 100k products / 1M comments.
+# bulk_create bypasses signals: derived data (rating counters, search
+# index) is filled in directly. created_at values are spread over the
+# last `days` days instead of all being "now".
+
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import ratings, search
+from .models import (
+    CartItem,
+    Category,
+    OfferAd,
+    Order,
+    OrderItem,
+    Product,
+    ProductComment,
+)
+
+
+CHUNK_SIZE = 5000
+
+CATEGORY_NAMES = [
+    "Shoes", "Sandals", "Boots", "T-Shirts", "Shirts", "Dresses", "Jeans",
+    "Trousers", "Watches", "Bags", "Wallets", "Sunglasses", "Belts", "Caps",
+    "Jackets", "Hoodies", "Socks", "Perfumes", "Headphones", "Backpacks",
+]
+BRANDS = [
+    "Alfani", "Boss", "Club Room", "Cole Haan", "Nunn Bush", "Calvin Klein",
+    "Crocs", "Levis", "Puma", "Nike", "Adidas", "Fossil", "Titan", "Zara",
+]
+ADJECTIVES = [
+    "Classic", "Slim", "Urban", "Vintage", "Sport", "Premium", "Casual",
+    "Leather", "Cotton", "Lightweight", "Waterproof", "Everyday", "Limited",
+]
+WORDS = (
+    "comfortable durable stylish breathable soft premium quality fit "
+    "design fabric leather cotton daily wear travel office party summer "
+    "winter lightweight sturdy elegant modern classic"
+).split()
+
+OFFER_RATIO = 0.2
+UNAVAILABLE_RATIO = 0.03
+# Reviews lean positive: P(1..5 stars)
+RATING_WEIGHTS = [0.05, 0.05, 0.10, 0.30, 0.50]
+STATUS_WEIGHTS = {
+    "PENDING": 0.15,
+    "SHIPPED": 0.15,
+    "COMPLETED": 0.55,
+    "CANCELLED": 0.08,
+    "RETURN_REQUESTED": 0.04,
+    "RETURNED": 0.03,
+}
+# Zipf-like popularity of products in comments, orders and carts
+POPULARITY_SKEW = 3
+# Cart sessions: still live / expired / session row already gone
+SESSION_CHURN = {"live": 0.25, "expired": 0.45, "missing": 0.30}
+
+USER_PREFIX = "seed-user-"
+
+
+# ================= HELPERS =================
+
+def _chunks(rows, size):
+    # Works on generators too: at most `size` rows are held at once
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _bulk_create(model, rows, chunk_size):
+    # One transaction per chunk keeps write locks short
+    total = 0
+    for chunk in _chunks(rows, chunk_size):
+        with transaction.atomic():
+            model.objects.bulk_create(chunk, batch_size=chunk_size)
+        total += len(chunk)
+    return total
+
+
+@contextmanager
+def _explicit_timestamps(*models):
+    # Let bulk_create keep the created_at / added_at values we generate
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, "auto_now_add", False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _popular(rng, items):
+    # Long tail over `items` ordered most popular first: with skew 3 the
+    # top 1% get ~20% of picks, the top 10% ~45%, and everything some
+    return items[int(len(items) * rng.random() ** POPULARITY_SKEW)]
+
+
+def _past(rng, now, days, recent_bias=1.0):
+    # A moment in the last `days` days; recent_bias > 1 favours recent ones
+    return now - timedelta(days=days * rng.random() ** recent_bias)
+
+
+def _text(rng, words):
+    return " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+
+
+# ================= STEPS =================
+
+def seed_categories(rng, count):
+    existing = set(Category.objects.values_list("slug", flat=True))
+    rows = []
+    for n in range(count):
+        name = CATEGORY_NAMES[n % len(CATEGORY_NAMES)]
+        if n >= len(CATEGORY_NAMES):
+            name = f"{name} {n // len(CATEGORY_NAMES) + 1}"
+        slug = slugify(name)
+        if slug not in existing:
+            rows.append(Category(name=name, slug=slug))
+    Category.objects.bulk_create(rows)
+    return list(Category.objects.order_by("id")[:count])
+
+
+def seed_products(rng, count, categories, now, days, chunk_size=CHUNK_SIZE):
+    # Numbered after the current max id, so slugs stay unique on reruns
+    start = (Product.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+
+    def rows():
+        for n in range(start, start + count):
+            category = rng.choice(categories)
+            name = f"{rng.choice(BRANDS)} {rng.choice(ADJECTIVES)} {category.name}"
+            price = Decimal(rng.randrange(199, 20000))
+            on_offer = rng.random() < OFFER_RATIO
+            yield Product(
+                category=category,
+                name=name,
+                slug=f"{slugify(name)}-{n}",
+                description=_text(rng, rng.randint(8, 40)),
+                price=price,
+                available=rng.random() > UNAVAILABLE_RATIO,
+                is_on_offer=on_offer,
+                offer_price=(price * Decimal(rng.uniform(0.5, 0.95))).quantize(Decimal("1")) if on_offer else None,
+                created_at=_past(rng, now, days),
+            )
+
+    _bulk_create(Product, rows(), chunk_size)
+    return list(Product.objects.filter(id__gte=start).order_by("id").values_list("id", "price"))
+
+
+def seed_users(rng, count, chunk_size=CHUNK_SIZE):
+    User = get_user_model()
+    start = User.objects.filter(username__startswith=USER_PREFIX).count()
+    _bulk_create(User, (
+        User(username=f"{USER_PREFIX}{n}", email=f"{USER_PREFIX}{n}@example.com", password="!")
+        for n in range(start, start + count)
+    ), chunk_size)
+    return list(
+        User.objects.filter(username__startswith=USER_PREFIX).values_list("id", flat=True)
+    )
+
+
+def seed_comments(rng, count, products, users, now, days, chunk_size=CHUNK_SIZE):
+    product_ids = [pk for pk, _ in products]
+    stars = list(ratings.STARS)
+    cum_weights = list(accumulate(RATING_WEIGHTS))
+    counters = {}
+
+    def rows():
+        for _ in range(count):
+            product_id = _popular(rng, product_ids)
+            star = rng.choices(stars, cum_weights=cum_weights)[0]
+            c = counters.setdefault(product_id, ratings._empty())
+            c[f"rating_{star}"] += 1
+            c["rating_count"] += 1
+            c["rating_sum"] += star
+            yield ProductComment(
+                product_id=product_id,
+                user_id=rng.choice(users),
+                text=_text(rng, rng.randint(4, 30)),
+                rating=star,
+                created_at=_past(rng, now, days, recent_bias=1.5),
+            )
+
+    _bulk_create(ProductComment, rows(), chunk_size)
+
+    # Counters straight from what was generated: no per-product recount
+    def updated():
+        for product_id, values in counters.items():
+            values["rating_avg"] = values["rating_sum"] / values["rating_count"]
+            yield Product(id=product_id, **values)
+
+    for chunk in _chunks(updated(), 1000):
+        with transaction.atomic():
+            Product.objects.bulk_update(chunk, ratings.COUNTER_FIELDS)
+    return count
+
+
+def seed_orders(rng, count, products, users, now, days, chunk_size=CHUNK_SIZE):
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    payments = [choice for choice, _ in Order.PAYMENT_CHOICES]
+
+    created = 0
+    for chunk_start in range(0, count, chunk_size):
+        size = min(chunk_size, count - chunk_start)
+        orders = []
+        for _ in range(size):
+            status = rng.choices(statuses, weights=weights)[0]
+            method = rng.choice(payments)
+            paid = method != "cod" or status == "COMPLETED"
+            orders.append(Order(
+                user_id=rng.choice(users),
+                name="Seed Customer",
+                address="1 Benchmark Street",
+                email="customer@example.com",
+                payment_method=method,
+                order_status=status,
+                paid=paid,
+                payment_status="COMPLETED" if paid else "PENDING",
+                created_at=_past(rng, now, days, recent_bias=1.5),
+            ))
+
+        with transaction.atomic():
+            orders = Order.objects.bulk_create(orders)
+            items = []
+            for order in orders:
+                # Order sizes: mostly 1-2 lines, occasionally more
+                for _ in range(min(1 + int(rng.expovariate(0.8)), 8)):
+                    product_id, price = _popular(rng, products)
+                    items.append(OrderItem(
+                        order_id=order.id,
+                        product_id=product_id,
+                        quantity=rng.choices([1, 2, 3], weights=[0.8, 0.15, 0.05])[0],
+                        price=price,
+                    ))
+            OrderItem.objects.bulk_create(items, batch_size=chunk_size)
+        created += size
+    return created
+
+
+def seed_carts(rng, count, products, now, days, chunk_size=CHUNK_SIZE):
+    # `count` anonymous carts of 1-5 lines. Each cart's session is live,
+    # expired, or already deleted (SESSION_CHURN), as on a real site where
+    # most visitors never come back.
+    product_ids = [pk for pk, _ in products]
+    session_data = SessionStore().encode({})
+    kinds = list(SESSION_CHURN)
+    weights = list(SESSION_CHURN.values())
+
+    created = 0
+    for chunk_start in range(0, count, chunk_size):
+        sessions, lines = [], []
+        for _ in range(min(chunk_size, count - chunk_start)):
+            key = f"{rng.getrandbits(128):032x}"
+            added = _past(rng, now, min(days, 60), recent_bias=0.7)
+            kind = rng.choices(kinds, weights=weights)[0]
+            if kind == "live":
+                expires = now + timedelta(days=rng.randint(1, 14))
+            else:
+                expires = min(added + timedelta(days=14), now - timedelta(hours=1))
+            if kind != "missing":
+                sessions.append(Session(session_key=key, session_data=session_data, expire_date=expires))
+            for product_id in {_popular(rng, product_ids) for _ in range(rng.randint(1, 5))}:
+                lines.append(CartItem(
+                    session_key=key,
+                    product_id=product_id,
+                    quantity=rng.choices([1, 2, 3], weights=[0.8, 0.15, 0.05])[0],
+                    added_at=added,
+                ))
+
+        with transaction.atomic():
+            Session.objects.bulk_create(sessions, batch_size=chunk_size)
+            CartItem.objects.bulk_create(lines, batch_size=chunk_size)
+        created += len(lines)
+    return created
+
+
+def seed_offer_ads(rng, count, now):
+    positions = [choice for choice, _ in OfferAd.POSITION_CHOICES]
+    ads = []
+    for n in range(count):
+        # Mix of past, running and upcoming campaigns
+        start = now + timedelta(days=rng.randint(-30, 10))
+        ads.append(OfferAd(
+            title=f"{rng.choice(ADJECTIVES)} {rng.choice(CATEGORY_NAMES)} Sale",
+            subtitle=f"Up to {rng.choice([20, 30, 40, 50, 60])}% off",
+            position=positions[n % len(positions)],
+            is_active=rng.random() > 0.1,
+            start_date=start,
+            end_date=start + timedelta(days=rng.randint(3, 30)),
+            created_at=start - timedelta(days=1),
+        ))
+    OfferAd.objects.bulk_create(ads)
+    return len(ads)
+
+
+# ================= ENTRY POINT =================
+
+def seed(products=1000, comments=5000, orders=1000, carts=0, offer_ads=0,
+         categories=20, users=None, days=365, seed=42, chunk_size=CHUNK_SIZE,
+         index=True, report=None):
+    # report(step, rows) is called after each step
+    rng = random.Random(seed)
+    report = report or (lambda step, rows: None)
+    users = users or max(50, comments // 20, orders // 10)
+    now = timezone.now()
+
+    with _explicit_timestamps(Product, ProductComment, Order, CartItem, OfferAd):
+        category_rows = seed_categories(rng, categories)
+        report("categories", len(category_rows))
+
+        product_rows = seed_products(rng, products, category_rows, now, days, chunk_size)
+        report("products", len(product_rows))
+
+        user_ids = seed_users(rng, users, chunk_size)
+        report("users", len(user_ids))
+
+        # Popularity order for _popular(): not tied to id or creation date
+        product_rows = product_rows[:]
+        rng.shuffle(product_rows)
+
+        report("comments", seed_comments(rng, comments, product_rows, user_ids, now, days, chunk_size))
+        report("orders", seed_orders(rng, orders, product_rows, user_ids, now, days, chunk_size))
+
+        if carts:
+            report("cart items", seed_carts(rng, carts, product_rows, now, days, chunk_size))
+        if offer_ads:
+            report("offer ads", seed_offer_ads(rng, offer_ads, now))
+
+    if index:
+        _, indexed = search.rebuild()
+        report("search index", indexed)
@@ -0,0 +1,131 @@
+# shop/signals.py
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import categories, db, images, offer_ads, price_alerts, quick_view, ratings, search, wishlist
+from .models import Category, OfferAd, Product, ProductComment, Wishlist
+
+
+# ================= SEARCH INDEX SYNC =================
+
+@receiver(post_save, sender=Product)
+def index_saved_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_deleted_product(sender, instance, **kwargs):
+    search.remove_product(instance.id)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_products(sender, instance, created=False, raw=False, **kwargs):
+    # New categories have no products yet; renames change every product row
+    if raw or created:
+        return
+    search.index_products(instance.products.all())
+
+
+# ================= RATING COUNTERS =================
+
+@receiver(post_save, sender=ProductComment)
+def count_saved_comment(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        ratings.apply(instance.product_id, instance.rating, +1)
+    else:
+        # Edited (e.g. rating changed in the admin): recount this product
+        ratings.recompute([instance.product_id])
+
+
+@receiver(post_delete, sender=ProductComment)
+def count_deleted_comment(sender, instance, **kwargs):
+    ratings.apply(instance.product_id, instance.rating, -1)
+
+
+# ================= OFFER ADS CACHE =================
+
+@receiver(post_save, sender=OfferAd)
+@receiver(post_delete, sender=OfferAd)
+def invalidate_offer_ads(sender, **kwargs):
+    offer_ads.invalidate()
+
+
+# ================= CATEGORY CACHE =================
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    categories.invalidate()
+
+
+# ================= QUICK VIEW CACHE =================
+
+@receiver(pre_save, sender=Product)
+def remember_product_state(sender, instance, raw=False, **kwargs):
+    # The cached quick-view fragment is keyed by slug, so a rename must drop
+    # the old one; the old display price feeds the price change log
+    if raw or instance.pk is None:
+        return
+    previous = (
+        Product.objects.filter(pk=instance.pk)
+        .only("slug", "price", "offer_price", "is_on_offer")
+        .first()
+    )
+    if previous is not None:
+        instance._previous_slug = previous.slug
+        instance._previous_price = previous.get_display_price()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_quick_view(sender, instance, **kwargs):
+    quick_view.invalidate(instance.slug, getattr(instance, "_previous_slug", None))
+
+
+# ================= PRICE CHANGE LOG =================
+
+@receiver(post_save, sender=Product)
+def log_price_change(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    price_alerts.log_change(instance, getattr(instance, "_previous_price", None))
+
+
+# ================= WISHLIST CACHE =================
+
+@receiver(post_save, sender=Wishlist)
+@receiver(post_delete, sender=Wishlist)
+def invalidate_wishlist(sender, instance, **kwargs):
+    wishlist.invalidate(instance.user_id, instance.session_key)
+
+
+# ================= IMAGE VARIANTS =================
+
+@receiver(post_save, sender=Product)
+def generate_image_variants(sender, instance, raw=False, **kwargs):
+    if raw or not instance.image:
+        return
+    name = instance.image.name
+    if not images.has_variants(name):
+        transaction.on_commit(lambda: images.generate(name))
+
+
+@receiver(post_delete, sender=Product)
+def delete_image_variants(sender, instance, **kwargs):
+    if instance.image:
+        name = instance.image.name
+        transaction.on_commit(lambda: images.delete_variants(name))
+
+
+# ================= SQLITE TUNING =================
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    db.configure_sqlite(connection)
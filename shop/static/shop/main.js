@@ -3,7 +3,6 @@ document.addEventListener('DOMContentLoaded', function () {
   const closeCartBtn = document.getElementById('close-cart');
   const cartDrawer = document.getElementById('cart-drawer');
   const overlay = document.getElementById('page-overlay');
-  const quickButtons = document.querySelectorAll('.quick-view');
   const quickModal = document.getElementById('quick-view');
   const quickContent = document.getElementById('quick-view-content');
 
@@ -14,21 +13,100 @@ document.addEventListener('DOMContentLoaded', function () {
   if(closeCartBtn) closeCartBtn.onclick=closeCart;
   overlay.onclick=closeCart;
 
-  quickButtons.forEach(btn=>{
-    btn.addEventListener('click',async()=>{
+  /* quick view: fragments are prefetched in batches as cards scroll into view */
+  const quickCache={};
+  const quickQueue=new Set();
+  let quickTimer=null;
+
+  async function prefetchQuick(){
+    quickTimer=null;
+    const slugs=[...quickQueue].filter(slug=>!(slug in quickCache));
+    quickQueue.clear();
+    if(!slugs.length) return;
+    const res=await fetch(`/api/products/quick/?slugs=${slugs.map(encodeURIComponent).join(',')}`);
+    if(!res.ok) return;
+    const data=await res.json();
+    Object.assign(quickCache,data.fragments);
+  }
+
+  const quickObserver='IntersectionObserver' in window
+    ? new IntersectionObserver(entries=>{
+        entries.forEach(en=>{
+          if(!en.isIntersecting) return;
+          quickQueue.add(en.target.dataset.slug);
+          quickObserver.unobserve(en.target);
+        });
+        if(quickQueue.size && !quickTimer) quickTimer=setTimeout(prefetchQuick,150);
+      },{rootMargin:'200px'})
+    : null;
+
+  function watchQuickButtons(){
+    if(!quickObserver) return;
+    document.querySelectorAll('.quick-view:not([data-watched])').forEach(btn=>{
+      btn.dataset.watched='1';
+      quickObserver.observe(btn);
+    });
+  }
+  watchQuickButtons();
+
+  document.addEventListener('click',async e=>{
+    const btn=e.target.closest('.quick-view');
+    if(btn && quickModal){
       const slug=btn.dataset.slug;
-      const res=await fetch(/product/${slug}/?quick=1);
-      const html=await res.text();
-      quickContent.innerHTML=html;
+      if(!(slug in quickCache)){
+        const res=await fetch(`/product/${slug}/quick/`);
+        if(!res.ok) return;
+        quickCache[slug]=await res.text();
+      }
+      quickContent.innerHTML=quickCache[slug];
       quickModal.classList.add('open');
       overlay.classList.add('active');
-    });
-  });
-
-  document.querySelectorAll('[data-close]').forEach(el=>{
-    el.onclick=()=>{
+      return;
+    }
+    const heart=e.target.closest('.wishlist-btn');
+    if(heart){
+      const active=heart.classList.contains('active');
+      const data=new FormData();
+      data.append('product_id',heart.dataset.product);
+      const res=await fetch(active?'/api/wishlist/remove/':'/api/wishlist/add/',{
+        method:'POST',
+        body:data,
+        headers:{'X-CSRFToken':document.querySelector('meta[name="csrf-token"]').content}
+      });
+      if(!res.ok) return;
+      const result=await res.json();
+      heart.classList.toggle('active',result.wishlisted);
+      heart.setAttribute('aria-pressed',result.wishlisted);
+      return;
+    }
+    if(e.target.closest('[data-close]') && quickModal){
       quickModal.classList.remove('open');
       overlay.classList.remove('active');
-    };
+    }
   });
+
+  /* infinite scroll: append the next keyset page of product cards */
+  const loadMore=document.querySelector('.load-more');
+  const grid=document.querySelector('.product-grid');
+  if(loadMore && grid && loadMore.dataset.next){
+    let loading=false;
+    async function loadNext(){
+      if(loading || !loadMore.dataset.next) return;
+      loading=true;
+      try{
+        const res=await fetch(loadMore.dataset.next,{headers:{'X-Requested-With':'XMLHttpRequest'}});
+        if(!res.ok) return;
+        const data=await res.json();
+        grid.insertAdjacentHTML('beforeend',data.html);
+        watchQuickButtons();
+        if(data.next){loadMore.dataset.next=data.next;}
+        else{observer && observer.disconnect();loadMore.parentNode.remove();}
+      }finally{loading=false;}
+    }
+    loadMore.addEventListener('click',e=>{e.preventDefault();loadNext();});
+    const observer='IntersectionObserver' in window
+      ? new IntersectionObserver(entries=>{if(entries.some(en=>en.isIntersecting)) loadNext();},{rootMargin:'400px'})
+      : null;
+    if(observer) observer.observe(loadMore);
+  }
 });
\ No newline at end of file
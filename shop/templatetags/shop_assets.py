@@ -0,0 +1,26 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from shop import assets
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def asset_css(bundle):
+    # {% asset_css "product_list" %} -> <link> for product_list.css
+    return format_html_join(
+        "\n", '<link rel="stylesheet" href="{}">',
+        ((static(path),) for path in assets.resolve(f"{bundle}.css")),
+    )
+
+
+@register.simple_tag
+def asset_js(bundle, defer=True):
+    attr = " defer" if defer else ""
+    return format_html_join(
+        "\n", '<script src="{}"' + attr + '></script>',
+        ((static(path),) for path in assets.resolve(f"{bundle}.js")),
+    )
@@ -0,0 +1,43 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from shop import images
+
+
+register = template.Library()
+
+
+def _srcset(name, fmt):
+    return ", ".join(
+        f"{default_storage.url(images.variant_name(name, variant, fmt))} {width}w"
+        for variant, width in images.VARIANTS.items()
+    )
+
+
+@register.simple_tag
+def responsive_image(image, alt="", sizes="100vw", variant="card", loading="lazy", **attrs):
+    # <picture> with WebP + JPEG srcsets; the original file until variants exist.
+    # Usage: {% responsive_image product.image alt=product.name sizes="68px" variant="thumb" %}
+    # Above-the-fold images: loading="eager" (plus fetchpriority="high")
+    extra = format_html_join("", ' {}="{}"', attrs.items())
+
+    if not image:
+        return ""
+    if not images.has_variants(image.name):
+        return format_html('<img src="{}" alt="{}" loading="{}"{}>', image.url, alt, loading, extra)
+
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" loading="{}" decoding="async"{}>'
+        '</picture>',
+        _srcset(image.name, "webp"),
+        sizes,
+        default_storage.url(images.variant_name(image.name, variant, "jpeg")),
+        _srcset(image.name, "jpeg"),
+        sizes,
+        alt,
+        loading,
+        extra,
+    )
@@ -0,0 +1,111 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError
+from django.test import RequestFactory, TestCase, override_settings
+
+from shop import cart as cart_module
+from shop.cart import MAX_QUANTITY, CacheCart, parse_quantities
+from shop.checkout import place_order
+from shop.models import CartItem, Category, Order, OrderItem, Product
+
+
+@override_settings(CACHES={"default": {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "shop-cart-tests",
+}})
+class CacheCartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Watches", slug="watches")
+        cls.product = Product.objects.create(
+            category=category, name="Titan Classic", slug="titan-classic", price=4999,
+        )
+        cls.other = Product.objects.create(
+            category=category, name="Titan Edge", slug="titan-edge", price=5999,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.cart = CacheCart(RequestFactory().get("/"))
+        self.cart.add(self.product, 1)
+
+    def same_cart(self):
+        other = CacheCart(RequestFactory().get("/"))
+        other.cart_id = self.cart.cart_id
+        return other
+
+    def order(self):
+        return Order(name="Buyer", address="1 Main St", email="buyer@example.com")
+
+    def test_failed_checkout_releases_marker(self):
+        with mock.patch.object(OrderItem.objects, "bulk_create", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                place_order(self.order(), cart=self.cart)
+
+        retry = self.same_cart()
+        with self.captureOnCommitCallbacks(execute=True):
+            place_order(self.order(), cart=retry)
+        self.assertEqual(OrderItem.objects.get().product, self.product)
+        self.assertEqual(self.same_cart().items, [])
+
+    def test_checkout_in_progress_is_not_released_by_another_request(self):
+        self.assertTrue(self.cart.checkout_lines())
+        self.assertEqual(self.same_cart().checkout_lines(), [])
+        self.same_cart().checkout_failed()
+        self.assertEqual(self.same_cart().checkout_lines(), [])
+
+    def test_concurrent_add_waits_for_write_lock(self):
+        lock = self.cart._key(":lock")
+        cache.add(lock, "held", cart_module.WRITE_LOCK_TIMEOUT)
+        worker = threading.Thread(target=self.same_cart().add, args=(self.other, 2))
+        worker.start()
+        worker.join(0.1)
+        self.assertTrue(worker.is_alive())
+
+        # The holder's own write lands first; the waiting add builds on it
+        self.cart._write(self.cart._read() | {"lines": self.cart._read()["lines"] + [
+            {"id": 99, "product_id": self.product.id, "quantity": 1, "size": "L"},
+        ]})
+        cache.delete(lock)
+        worker.join(5)
+
+        lines = {(i.product_id, i.size): i.quantity for i in self.same_cart().items}
+        self.assertEqual(lines, {
+            (self.product.id, None): 1,
+            (self.product.id, "L"): 1,
+            (self.other.id, None): 2,
+        })
+
+
+class ParseQuantitiesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Watches", slug="watches")
+        cls.product = Product.objects.create(
+            category=category, name="Titan Classic", slug="titan-classic", price=4999,
+        )
+
+    def test_quantities_within_cap(self):
+        quantities = parse_quantities({"qty_1": "3", "qty_2": "0", "qty_3": "-4", "other": "x"})
+        self.assertEqual(quantities, {1: 3, 2: 0, 3: 0})
+        self.assertEqual(parse_quantities({"qty_1": str(MAX_QUANTITY)}), {1: MAX_QUANTITY})
+
+    def test_quantity_above_cap_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            parse_quantities({"qty_1": str(MAX_QUANTITY + 1)})
+
+    def test_huge_quantity_is_a_400_not_a_500(self):
+        self.client.post("/api/cart/add/", {"product_id": self.product.id, "quantity": 1})
+        item = CartItem.objects.get()
+
+        response = self.client.post("/api/cart/update/", {f"qty_{item.id}": "1" + "0" * 20})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()["ok"])
+
+        response = self.client.post("/cart/", {f"qty_{item.id}": "1" + "0" * 20})
+        self.assertEqual(response.status_code, 302)
+        item.refresh_from_db()
+        self.assertEqual(item.quantity, 1)
@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from shop import categories
+from shop.models import Category
+
+
+class CategoryCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.create(name="Watches", slug="watches")
+
+    def setUp(self):
+        cache.clear()
+        self.client.get("/api/categories/")  # warm the snapshot
+
+    def version_reads(self):
+        get = mock.patch.object(categories.cache, "get", wraps=cache.get)
+        self.addCleanup(get.stop)
+        spy = get.start()
+        return lambda: sum(call.args[0] == categories.VERSION_KEY for call in spy.call_args_list)
+
+    def test_api_categories_runs_no_queries_and_reads_version_once(self):
+        reads = self.version_reads()
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/categories/")
+        self.assertEqual(response.json()["categories"][0]["name"], "Watches")
+        self.assertEqual(reads(), 1)
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/categories/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(reads(), 2)
+
+    def test_rename_reloads_snapshot(self):
+        Category.objects.filter(slug="watches").update(name="Clocks")
+        categories.invalidate()
+        response = self.client.get("/api/categories/")
+        self.assertEqual(response.json()["categories"][0]["name"], "Clocks")
@@ -0,0 +1,43 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.test import TransactionTestCase
+
+from shop import categories, db_router, offer_ads, quick_view
+from shop.models import Category, Product
+
+
+# TransactionTestCase: inside TestCase's transaction every read already
+# stays on the primary
+@mock.patch.object(db_router, "enabled", return_value=True)
+class CacheFillRoutingTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="Watches", slug="watches")
+        self.product = Product.objects.create(
+            category=category, name="Titan Classic", slug="titan-classic", price=4999,
+        )
+        state, token = db_router.start()
+        self.addCleanup(db_router.stop, token)
+        self.state = state
+        self.router = db_router.ReplicaRouter()
+
+    def test_primary_pins_reads_for_the_block_only(self, enabled):
+        self.assertEqual(self.router.db_for_read(Product), db_router.REPLICA)
+        with db_router.primary():
+            self.assertEqual(self.router.db_for_read(Product), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(Product), db_router.REPLICA)
+
+    def test_write_inside_primary_keeps_request_pinned(self, enabled):
+        with db_router.primary():
+            self.router.db_for_write(Product)
+        self.assertEqual(self.router.db_for_read(Product), DEFAULT_DB_ALIAS)
+
+    def test_cache_fills_read_from_primary(self, enabled):
+        # There is no "replica" connection here: any read routed to it fails
+        categories.invalidate()
+        self.assertEqual([c.slug for c in categories.all_categories()], ["watches"])
+        self.assertIn(self.product.slug, quick_view.fragments([self.product.slug]))
+        self.assertEqual(offer_ads.active_offer_ads(), [])
+        self.assertFalse(self.state.pinned)
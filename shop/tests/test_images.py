@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from shop import images
+from shop.models import Category, Product
+
+
+@mock.patch.object(images, "has_variants", return_value=True)
+class ResponsiveImageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Watches", slug="watches")
+        cls.product = Product.objects.create(
+            category=category, name="Titan Classic", slug="titan-classic",
+            price=4999, image="products/titan.jpg",
+        )
+        Product.objects.create(
+            category=category, name="Titan Edge", slug="titan-edge",
+            price=5999, image="products/edge.jpg",
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_product_detail_serves_variants(self, has_variants):
+        html = self.client.get(self.product.get_absolute_url()).content.decode()
+        self.assertIn('src="/media/products/variants/titan-detail.jpg"', html)
+        self.assertIn('loading="eager"', html)
+        # Recommendation card
+        self.assertIn('src="/media/products/variants/edge-card.jpg"', html)
+        self.assertNotIn('src="/media/products/titan.jpg"', html)
+
+    def test_checkout_summary_serves_thumbnails(self, has_variants):
+        self.client.force_login(get_user_model().objects.create_user("buyer"))
+        self.client.post("/api/cart/add/", {"product_id": self.product.id, "quantity": 1})
+        html = self.client.get("/checkout/").content.decode()
+        self.assertIn("titan-thumb.jpg", html)
+        self.assertNotIn('src="/media/products/titan.jpg"', html)
@@ -0,0 +1,44 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from shop import order_states
+from shop.models import Order, OrderStatusEvent
+
+
+class ApplyTransitionTests(TestCase):
+    def make_order(self, **fields):
+        return Order.objects.create(
+            name="Buyer", address="1 Main St", email="buyer@example.com", **fields
+        )
+
+    def test_event_keeps_refund_status_the_transition_leaves_alone(self):
+        order = self.make_order(order_status="PENDING", refund_status="REFUND_PENDING")
+        self.assertEqual(order_states.apply(Order.objects.filter(pk=order.pk), "ship"), 1)
+
+        event = OrderStatusEvent.objects.get(order=order, transition="ship")
+        self.assertEqual((event.from_status, event.to_status), ("PENDING", "SHIPPED"))
+        self.assertEqual(event.refund_status, "REFUND_PENDING")
+
+    def test_event_records_refund_status_the_transition_sets(self):
+        order = self.make_order(order_status="RETURN_REQUESTED", refund_status="REFUND_PENDING")
+        order_states.apply(Order.objects.filter(pk=order.pk), "approve_return")
+
+        event = OrderStatusEvent.objects.get(order=order, transition="approve_return")
+        self.assertEqual(event.refund_status, "REFUNDED")
+
+    @skipUnless(
+        connection.vendor == "sqlite"
+        and connection.settings_dict["OPTIONS"].get("transaction_mode") == "IMMEDIATE",
+        "atomic() only takes the write lock on BEGIN IMMEDIATE",
+    )
+    def test_single_update_pass_when_atomic_takes_the_write_lock(self):
+        orders = [self.make_order(order_status="PENDING") for _ in range(3)]
+
+        with CaptureQueriesContext(connection) as queries:
+            order_states.apply(Order.objects.filter(pk__in=[o.pk for o in orders]), "ship")
+
+        updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "shop_order"')]
+        self.assertEqual(len(updates), 1)
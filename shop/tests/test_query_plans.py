@@ -0,0 +1,112 @@
+# Query-plan regression check: request the hot pages, run EXPLAIN QUERY
+# PLAN on every SELECT they issue and fail on full table scans, unbounded
+# index scans and sorts in a temporary B-tree.
+
+import re
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from shop import cart, search, seed
+from shop.models import Category, Product
+from shop.search import FTS_TABLE
+
+
+# Small, cached tables where a full scan (and sorting it) is expected
+ALLOWED_SCANS = {"shop_category", "shop_offerad", "sqlite_master"}
+
+_LIMIT_RE = re.compile(r"\bLIMIT\s+\d+\s*$")
+
+
+def plan_problems(sql, plan):
+    # EXPLAIN QUERY PLAN rows: (id, parent, notused, detail).
+    #   SEARCH t USING ...       index lookup or range: fine
+    #   SCAN t                   full table scan
+    #   SCAN t USING INDEX i     full index walk; only bounded when the
+    #                            statement stops at a LIMIT
+    #   USE TEMP B-TREE FOR ...  rows sorted or grouped after reading
+    details = [row[-1] for row in plan]
+    scanned = {d.split()[1] for d in details if d.startswith("SCAN ")}
+    # Sorting is fine when it only reads small tables or a subquery's
+    # already-filtered rows (e.g. the cart's window-function totals)
+    small = bool(scanned) and all(t in ALLOWED_SCANS or t.startswith("(") for t in scanned)
+    limited = bool(_LIMIT_RE.search(sql))
+
+    problems = []
+    for detail in details:
+        if detail.startswith("SCAN "):
+            table = detail.split()[1]
+            # "(subquery-N)" / CTE scans read an already-filtered result
+            if table in ALLOWED_SCANS or table.startswith("(") or "VIRTUAL TABLE" in detail:
+                continue
+            if "USING" in detail and limited:
+                continue
+            problems.append(detail)
+        elif "TEMP B-TREE" in detail and not small:
+            # Full-text matches have no index order: sorting them (by bm25
+            # or an explicit sort) is bounded by the match set
+            if f"{FTS_TABLE} MATCH" not in sql:
+                problems.append(detail)
+    return problems
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN checks are SQLite-specific")
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed.seed(products=300, comments=600, orders=60, categories=5, seed=7)
+        search.reset_backend_cache()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        cls.user = get_user_model().objects.filter(order__isnull=False).first()
+
+    def setUp(self):
+        cache.clear()
+
+    def pages(self):
+        product = Product.objects.filter(available=True).first()
+        category = Category.objects.first()
+
+        yield "product list", "/"
+        yield "product list by price", "/?sort=price_asc"
+        yield "product list by price desc", "/?sort=price_desc"
+        yield "product list by rating", "/?sort=rating"
+        yield "search", f"/?q={product.name.split()[0]}"
+        yield "search by price", f"/?q={product.name.split()[0]}&sort=price_asc"
+        yield "category", category.get_absolute_url()
+        yield "offers", "/offers/?sort=price_asc"
+
+        for sort in ("", "price_asc", "rating"):
+            next_page = self.client.get("/api/products/", {"sort": sort}).json()["next"]
+            yield f"next catalog page {sort}", next_page
+
+        yield "product detail", product.get_absolute_url()
+
+        self.client.post("/api/cart/add/", {"product_id": product.id, "quantity": 1})
+        yield "cart", "/cart/"
+
+        self.client.force_login(self.user)
+        yield "order history", "/my-orders/"
+
+    def test_hot_pages_use_indexes(self):
+        failures = []
+        with mock.patch.object(cart, "BACKEND", "db"):
+            for label, url in self.pages():
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200, f"{label}: GET {url}")
+
+                for query in queries.captured_queries:
+                    sql = query["sql"]
+                    if not sql.startswith("SELECT"):
+                        continue
+                    with connection.cursor() as cursor:
+                        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                        plan = cursor.fetchall()
+                    failures += [f"[{label}] {p}\n    {sql}" for p in plan_problems(sql, plan)]
+
+        self.assertFalse(failures, "\n".join(failures))
@@ -0,0 +1,33 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from shop import quick_view
+from shop.models import Category, Product
+
+
+class QuickViewInvalidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Watches", slug="watches")
+        cls.product = Product.objects.create(
+            category=category, name="Titan Classic", slug="titan-classic", price=4999,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bulk_price_update_drops_cached_fragment(self):
+        self.assertIn("4999", quick_view.fragments([self.product.slug])[self.product.slug])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(id=self.product.id).update(price=3999)
+
+        self.assertIn("3999", quick_view.fragments([self.product.slug])[self.product.slug])
+
+    def test_bulk_availability_update_hides_fragment(self):
+        quick_view.fragments([self.product.slug])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(id=self.product.id).update(available=False)
+
+        self.assertEqual(quick_view.fragments([self.product.slug]), {})
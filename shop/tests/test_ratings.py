@@ -0,0 +1,42 @@
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+
+from shop import ratings
+from shop.models import Category, Product, ProductComment
+
+
+class RatingCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Watches", slug="watches")
+        cls.product = Product.objects.create(
+            category=category, name="Titan Classic", slug="titan-classic", price=4999,
+        )
+        cls.user = User.objects.create_user("reviewer")
+
+    def test_admin_save_keeps_counters_updated_meanwhile(self):
+        stale = Product.objects.get(id=self.product.id)
+        ProductComment.objects.create(product=self.product, user=self.user, text="Nice", rating=4)
+
+        stale.name = "Titan Classic II"
+        request = RequestFactory().post("/admin/")
+        admin.site._registry[Product].save_model(request, stale, form=None, change=True)
+
+        product = Product.objects.get(id=self.product.id)
+        self.assertEqual(product.name, "Titan Classic II")
+        self.assertEqual((product.rating_count, product.rating_4), (1, 1))
+
+    def test_reconcile_fixes_drift_across_batches(self):
+        other = Product.objects.create(
+            category=self.product.category, name="Titan Edge", slug="titan-edge", price=5999,
+        )
+        ProductComment.objects.create(product=other, user=self.user, text="Good", rating=5)
+        Product.objects.filter(id=other.id).update(rating_count=7, rating_5=0)
+
+        self.assertEqual(ratings.reconcile(batch_size=1, dry_run=True), [other.id])
+        self.assertEqual(ratings.reconcile(batch_size=1), [other.id])
+
+        other.refresh_from_db()
+        self.assertEqual((other.rating_count, other.rating_5, other.rating_avg), (1, 1, 5.0))
+        self.assertEqual(ratings.reconcile(batch_size=1), [])
@@ -0,0 +1,80 @@
+import re
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from shop import search
+from shop.models import Category, Product
+
+
+class CatalogSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        search.reset_backend_cache()
+        category = Category.objects.create(name="Shoes", slug="shoes")
+        cls.sneaker = Product.objects.create(
+            category=category, name="Puma Runner Sneaker", slug="puma-runner", price=1999,
+        )
+        cls.boot = Product.objects.create(
+            category=category, name="Leather Boot", slug="leather-boot", price=2999,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_matching_query(self):
+        response = self.client.get("/", {"q": "sneaker"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p.id for p in response.context["products"]], [self.sneaker.id])
+
+    def test_query_without_matches(self):
+        for url in ("/", "/api/products/"):
+            with self.subTest(url=url):
+                response = self.client.get(url, {"q": "zzzqqxx"})
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.client.get("/", {"q": "zzzqqxx"}).context["products"]), 0)
+
+    def test_punctuation_only_query(self):
+        # Nothing to search for: the unfiltered grid
+        for q in ("*", '"', "NEAR("):
+            for url in ("/", "/api/products/"):
+                with self.subTest(q=q, url=url):
+                    response = self.client.get(url, {"q": q})
+                    self.assertEqual(response.status_code, 200)
+        response = self.client.get("/", {"q": "*"})
+        self.assertEqual(len(response.context["products"]), 2)
+
+    def test_explicit_sort(self):
+        response = self.client.get("/", {"q": "sneaker", "sort": "price_desc"})
+        self.assertEqual([p.id for p in response.context["products"]], [self.sneaker.id])
+
+
+class RankedPagingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        search.reset_backend_cache()
+        category = Category.objects.create(name="Bags", slug="bags")
+        Product.objects.bulk_create([
+            Product(category=category, name=f"Travel Backpack {n}", slug=f"backpack-{n}",
+                    price=1000 + n, available=n % 10 != 0)
+            for n in range(60)
+        ])
+        search.rebuild()
+        cls.expected = set(
+            Product.objects.filter(available=True).values_list("id", flat=True)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_cover_every_match_once(self):
+        seen = []
+        response = self.client.get("/", {"q": "backpack"})
+        seen += [p.id for p in response.context["products"]]
+        url = response.context["next_fragment_url"]
+        while url:
+            data = self.client.get(url).json()
+            seen += [int(pk) for pk in re.findall(r'data-product="(\d+)"', data["html"])]
+            url = data["next"]
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(set(seen), self.expected)
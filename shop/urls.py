@@ -24,6 +24,7 @@ urlpatterns = [
         views.product_detail,
         name='product_detail'
     ),
+    path('product/<slug:slug>/quick/', views.product_quick, name='product_quick'),
 
     # ================= CART =================
     path('cart/', views.cart_view, name='cart'),
@@ -33,6 +34,9 @@ urlpatterns = [
 
     path('cart/remove/<int:item_id>/', views.cart_remove, name='cart_remove'),
 
+    # ================= WISHLIST =================
+    path('wishlist/', views.wishlist_view, name='wishlist'),
+
     # ================= CHECKOUT =================
     path('checkout/', views.checkout, name='checkout'),
 
@@ -56,8 +60,14 @@ urlpatterns = [
 
     # ================= AJAX / API =================
     path('api/categories/', views.api_categories, name='api_categories'),
+    path('api/products/', views.api_products, name='api_products'),
+    path('api/products/quick/', views.api_quick_view, name='api_quick_view'),
     path('api/cart/summary/', views.api_cart_summary, name='api_cart_summary'),
     path('api/cart/add/', views.api_cart_add, name='api_cart_add'),
+    path('api/cart/update/', views.api_cart_update, name='api_cart_update'),
+    path('api/wishlist/', views.api_wishlist, name='api_wishlist'),
+    path('api/wishlist/add/', views.api_wishlist_add, name='api_wishlist_add'),
+    path('api/wishlist/remove/', views.api_wishlist_remove, name='api_wishlist_remove'),
     path('order/<int:order_id>/cancel/', views.cancel_order, name='cancel_order'),
    
    path("about/", views.about_page, name="about"),
@@ -1,15 +1,12 @@
 from decimal import Decimal
-from io import BytesIO
-import qrcode
 
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse, HttpResponseBadRequest
 from django.shortcuts import render, get_object_or_404, redirect
 from django.template.loader import render_to_string
 from django.views.decorators.http import require_POST
-from django.db.models import Q
 from django.urls import reverse
-from django.utils import timezone
-from datetime import timedelta
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from .forms import (
     AddToCartForm,
     CheckoutForm,
@@ -18,8 +15,14 @@ from .forms import (
     PANT_SIZES
 )
 from .models import ProductComment
-from django.db.models import Avg, Count
-from django.conf import settings
+from . import categories as category_cache
+from . import order_states, pagination, qr, quick_view, search, wishlist
+from .cart import MAX_QUANTITY, get_cart, parse_quantities
+from .checkout import EmptyCart, place_order
+from .offer_ads import active_offer_ads
+from .orders import ORDERS_PER_PAGE, order_history, with_return_window
+from django.core.exceptions import ValidationError
+from django.db import transaction
 
 
 
@@ -33,71 +36,113 @@ from django.contrib import messages
 
 from .models import (
     Product,
-    Category,
-    CartItem,
     Order,
-    OrderItem,   # ✅ ADD THIS LINE
-    OfferAd
 )
 
 
 
-# ================= SESSION HELPER =================
+# ================= CATALOG PAGING =================
 
-def _get_session_key(request):
-    if not request.session.session_key:
-        request.session.create()
-    return request.session.session_key
+PRODUCT_SORTS = {
+    'price_asc': 'price',
+    'price_desc': '-price',
+    'new': '-created_at',
+    'rating': '-rating_avg',
+}
 
+OFFER_SORTS = {
+    'price_asc': 'offer_price',
+    'price_desc': '-offer_price',
+    'rating': '-rating_avg',
+}
 
-# ================= HOME / PRODUCT LIST =================
 
-def product_list(request, category_slug=None):
-    category = None
-    categories = Category.objects.all()
+def _catalog_page(request, category=None, offers=False):
     products = Product.objects.filter(available=True)
 
     q = request.GET.get('q', '').strip()
     sort = request.GET.get('sort', '').strip()
 
-    order_placed = request.GET.get('order') == '1'
-    order_paid = request.GET.get('paid') == '1'
+    if offers:
+        # offer_price is nullable; NULLs can't take part in a keyset
+        products = products.filter(is_on_offer=True, offer_price__isnull=False)
+        sorts = OFFER_SORTS
+        fields = ('name', 'description')
+    else:
+        sorts = PRODUCT_SORTS
+        fields = search.FIELDS
 
     # ---------- CATEGORY ----------
-    if category_slug:
-        category = get_object_or_404(Category, slug=category_slug)
+    if category:
         products = products.filter(category=category)
 
     # ---------- SEARCH ----------
-    if q:
-        products = products.filter(
-            Q(name__icontains=q) |
-            Q(description__icontains=q) |
-            Q(category__name__icontains=q)
-        )
+    # Ranked by relevance unless an explicit sort is chosen
+    cursor = request.GET.get('cursor')
+    if q and sort not in sorts:
+        ids = search.search_ids(q, fields=fields)
+        if ids is not None:
+            return pagination.paginate_ranked(products, ids, cursor)
+    elif q:
+        products = search.filter_queryset(products, q, fields=fields)
 
     # ---------- SORT ----------
-    if sort == 'price_asc':
-        products = products.order_by('price')
-    elif sort == 'price_desc':
-        products = products.order_by('-price')
-    elif sort == 'new':
-        products = products.order_by('-created_at')
-    else:
-        products = products.order_by('-created_at')
+    ordering = sorts.get(sort) or '-created_at'
+
+    return pagination.paginate(products, ordering, cursor)
+
+
+def _next_page_urls(request, page, **extra):
+    if not page.has_next:
+        return None, None
+
+    params = request.GET.copy()
+    params['cursor'] = page.next_cursor
+    page_url = f"{request.path}?{params.urlencode()}"
+
+    for key, value in extra.items():
+        if value:
+            params[key] = value
+    fragment_url = f"{reverse('shop:api_products')}?{params.urlencode()}"
+
+    return page_url, fragment_url
+
+
+def _get_category_or_404(slug):
+    # Served from the in-process category cache (shop/categories.py)
+    category = category_cache.get_by_slug(slug)
+    if category is None:
+        raise Http404("No Category matches the given query.")
+    return category
+
+
+# ================= HOME / PRODUCT LIST =================
+
+def product_list(request, category_slug=None):
+    category = None
+    categories = category_cache.all_categories()
+
+    order_placed = request.GET.get('order') == '1'
+    order_paid = request.GET.get('paid') == '1'
+
+    if category_slug:
+        category = _get_category_or_404(category_slug)
+
+    products = _catalog_page(request, category=category)
+    next_page_url, next_fragment_url = _next_page_urls(
+        request, products, category=category_slug
+    )
 
     # ---------- OFFER ADS (PHASE 4) ----------
-    now = timezone.now()
-    offer_ads = OfferAd.objects.filter(
-        is_active=True,
-        start_date__lte=now,
-        end_date__gte=now
-    ).order_by('-created_at')
+    # Cached until the next ad start/end or admin edit (shop/offer_ads.py)
+    offer_ads = active_offer_ads()
 
     return render(request, 'shop/product_list.html', {
         'category': category,
         'categories': categories,
         'products': products,
+        'next_page_url': next_page_url,
+        'next_fragment_url': next_fragment_url,
         'offer_ads': offer_ads,
         'order_placed': order_placed,
         'order_paid': order_paid,
@@ -108,31 +153,18 @@ def product_list(request, category_slug=None):
 # ================= OFFERS PAGE =================
 
 def offers_list(request):
-    categories = Category.objects.all()
-    products = Product.objects.filter(
-        available=True,
-        is_on_offer=True
-    )
+    categories = category_cache.all_categories()
 
-    q = request.GET.get('q', '').strip()
-    sort = request.GET.get('sort', '').strip()
-
-    if q:
-        products = products.filter(
-            Q(name__icontains=q) |
-            Q(description__icontains=q)
-        )
-
-    if sort == 'price_asc':
-        products = products.order_by('offer_price')
-    elif sort == 'price_desc':
-        products = products.order_by('-offer_price')
-    else:
-        products = products.order_by('-created_at')
+    products = _catalog_page(request, offers=True)
+    next_page_url, next_fragment_url = _next_page_urls(
+        request, products, offers='1'
+    )
 
     return render(request, 'shop/product_list.html', {
         'categories': categories,
         'products': products,
+        'next_page_url': next_page_url,
+        'next_fragment_url': next_fragment_url,
         'offers_page': True,
         'category': None,
         'order_placed': False,
@@ -145,11 +177,12 @@ def offers_list(request):
 
 
 def product_detail(request, slug):
-    product = get_object_or_404(Product, slug=slug, available=True)
-
     # ================= QUICK VIEW =================
+    # Old `?quick=1` links: served from the fragment cache
     if request.method == "GET" and request.GET.get("quick"):
-        return render(request, "shop/_product_quick.html", {"product": product})
+        return product_quick(request, slug)
+
+    product = get_object_or_404(Product, slug=slug, available=True)
 
     # ================= ADD TO CART FORM =================
     form = AddToCartForm(request.POST or None)
@@ -173,12 +206,14 @@ def product_detail(request, slug):
             rating = min(max(rating, 1), 5)  # ⭐ SAFETY
 
             if text:
-                ProductComment.objects.create(
-                    product=product,
-                    user=request.user,
-                    text=text,
-                    rating=rating
-                )
+                # Comment + rating counters commit together
+                with transaction.atomic():
+                    ProductComment.objects.create(
+                        product=product,
+                        user=request.user,
+                        text=text,
+                        rating=rating
+                    )
         return redirect(request.path)
 
     # ================= HANDLE ADD TO CART =================
@@ -186,99 +221,64 @@ def product_detail(request, slug):
         qty = form.cleaned_data.get("quantity", 1)
         size = form.cleaned_data.get("size")
 
-        session_key = _get_session_key(request)
-
-        item, created = CartItem.objects.get_or_create(
-            session_key=session_key,
-            product=product,
-            size=size
-        )
-
-        item.quantity = qty if created else item.quantity + qty
-        item.save()
+        get_cart(request).add(product, qty, size)
 
         return redirect("shop:cart")
 
     # ================= COMMENTS QUERY =================
     comments = ProductComment.objects.filter(
         product=product
-    ).order_by("-created_at")
-
-   # ================= RATING SUMMARY =================
-    rating_summary = comments.values("rating").annotate(count=Count("id"))
-    total_reviews = comments.count()
-    avg_rating = comments.aggregate(avg=Avg("rating"))["avg"] or 0
-
-# Build rating_data {1:count, 2:count, ...}
-    rating_data = {i: 0 for i in range(1, 6)}
-    for r in rating_summary:
-     rating_data[r["rating"]] = r["count"]
-
-# Build rating_percent {1:%, 2:%, ...}
-    rating_percent = {
-     i: (rating_data[i] / total_reviews) * 100 if total_reviews else 0
-    for i in range(1, 6)
-}
+    ).select_related("user").order_by("-created_at")
+
+    # ================= RECOMMENDATIONS =================
+    # Newest available products of the same category (partial category index)
+    recommendations = (
+        Product.objects
+        .filter(category_id=product.category_id, available=True)
+        .exclude(id=product.id)
+        .order_by("-created_at", "-id")[:4]
+    )
 
-# ================= AMAZON STYLE RATING ROWS =================
-    rating_rows = []
-    for star in range(5, 0, -1):
-     rating_rows.append({
-        "star": star,
-        "count": rating_data[star],
-        "percent": rating_percent[star],
-    })
+    # ================= RATING SUMMARY =================
+    # Counters live on Product (shop/ratings.py): no aggregate queries here
 
-# ================= FINAL RENDER =================
+    # ================= FINAL RENDER =================
     return render(request, "shop/product_detail.html", {
-    "product": product,
-    "form": form,
-    "comments": comments,
-    "rating_rows": rating_rows,
-    "total_reviews": total_reviews,
-    "avg_rating": round(avg_rating, 1),
-    "star_range": [5, 4, 3, 2, 1],
-})
+        "product": product,
+        "form": form,
+        "comments": comments,
+        "recommendations": recommendations,
+        "rating_rows": product.rating_rows(),
+        "total_reviews": product.rating_count,
+        "avg_rating": round(product.rating_avg, 1),
+        "star_range": [5, 4, 3, 2, 1],
+    })
+
+
 # ================= CART =================
 
 def cart_view(request):
-    session_key = _get_session_key(request)
-    items = CartItem.objects.filter(session_key=session_key)
-
     if request.method == 'POST':
-        for key, value in request.POST.items():
-            if key.startswith('qty_'):
-                try:
-                    item_id = int(key.split('_')[1])
-                    qty = int(value)
-                    item = CartItem.objects.get(
-                        id=item_id,
-                        session_key=session_key
-                    )
-                    if qty <= 0:
-                        item.delete()
-                    else:
-                        item.quantity = qty
-                        item.save()
-                except Exception:
-                    pass
+        try:
+            quantities = parse_quantities(request.POST)
+        except ValidationError:
+            messages.error(request, "Please enter valid quantities.")
+        else:
+            get_cart(request).update_quantities(quantities)
         return redirect('shop:cart')
 
-    total = sum(
-        Decimal(item.product.get_display_price()) * item.quantity
-        for item in items
-    )
+    cart = get_cart(request)
 
     return render(request, 'shop/cart.html', {
-        'items': items,
-        'total': total
+        'items': cart.items,
+        'total': cart.subtotal,
+        'max_quantity': MAX_QUANTITY,
     })
 
 
 @require_POST
 def cart_remove(request, item_id):
-    session_key = _get_session_key(request)
-    CartItem.objects.filter(id=item_id, session_key=session_key).delete()
+    get_cart(request).remove(item_id)
     return redirect("shop:cart")
 
 
@@ -287,12 +287,6 @@ def cart_remove(request, item_id):
 @login_required(login_url="shop:login")
 def checkout(request):
 
-    # Ensure session exists
-    if not request.session.session_key:
-        request.session.create()
-
-    session_key = request.session.session_key
-
     # ================= BUY NOW LOGIC =================
     buy_now_product_id = request.session.get("buy_now_product_id")
 
@@ -313,15 +307,13 @@ def checkout(request):
 
     else:
         # ================= NORMAL CART LOGIC =================
-        items = CartItem.objects.filter(session_key=session_key)
+        cart = get_cart(request)
+        items = cart.items
 
-        if not items.exists():
+        if not items:
             return redirect("shop:product_list")
 
-        total = sum(
-            Decimal(str(item.product.get_display_price())) * item.quantity
-            for item in items
-        )
+        total = cart.subtotal
 
     # (rest of your checkout logic continues...)
 
@@ -369,36 +361,20 @@ def checkout(request):
                 order.payment_status = "PENDING"
                 order.payment_details = "Cash on Delivery"
 
-            # SAVE ORDER
-            order.save()
-
-            # ================= SAVE ORDER ITEMS =================
-            # Buy now case
-            if buy_now_product_id:
-                OrderItem.objects.create(
-                    order=order,
-                    product=product,
-                    quantity=1,
-                    price=product.get_display_price(),
-                    size=None
-                )
-
-                # Clear buy now session after order
-                request.session.pop("buy_now_product_id", None)
-
-            # Normal cart case
-            else:
-                for item in items:
-                    OrderItem.objects.create(
-                        order=order,
-                        product=item.product,
-                        quantity=item.quantity,
-                        price=item.product.get_display_price(),
-                        size=item.size
-                    )
-
-                # Clear cart
-                items.delete()
+            # ================= PLACE ORDER =================
+            # Order, items and cart clear commit together (shop/checkout.py)
+            try:
+                if buy_now_product_id:
+                    place_order(order, buy_now=(product, buy_now_qty, buy_now_size))
+
+                    # Clear buy now session after order
+                    for key in ("buy_now_product_id", "buy_now_qty", "buy_now_size"):
+                        request.session.pop(key, None)
+                else:
+                    place_order(order, cart=get_cart(request))
+            except EmptyCart:
+                # Cart was emptied meanwhile (e.g. a double submit)
+                return redirect("shop:product_list")
 
             return redirect(
                 f"{reverse('shop:product_list')}?order=1&paid={'1' if order.paid else '0'}"
@@ -411,59 +387,49 @@ def checkout(request):
     })
 # ================= UPI QR CODE =================
 
+QR_MAX_AGE = 60 * 60 * 24
+
 def upi_qr(request):
-    amount = request.GET.get("amount", "0")
-    app = request.GET.get("app", "gpay")   # default gpay
-
-    if app == "phonepe":
-        upi_id = settings.PHONEPE_UPI_ID
-        name = "PhonePe"
-    elif app == "paytm":
-        upi_id = settings.PAYTM_UPI_ID
-        name = "Paytm"
-    else:
-        upi_id = settings.GPAY_UPI_ID
-        name = "GPay"
-
-    payload = (
-        f"upi://pay?"
-        f"pa={upi_id}&"
-        f"pn={name}&"
-        f"am={amount}&"
-        f"cu=INR"
-    )
+    app = qr.normalize_app(request.GET.get("app", "gpay"))   # default gpay
+    fmt = request.GET.get("format", "png")
+    if fmt not in qr.FORMATS:
+        fmt = "png"
+
+    try:
+        amount = qr.normalize_amount(request.GET.get("amount", "0"))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid amount")
 
-    qr = qrcode.make(payload)
-    buffer = BytesIO()
-    qr.save(buffer, format="PNG")
+    # Cached per (app, amount, format); see shop/qr.py
+    data, etag = qr.render(app, amount, fmt)
 
-    return HttpResponse(buffer.getvalue(), content_type="image/png")
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(data, content_type=qr.FORMATS[fmt])
+    response["ETag"] = etag
+    response["Cache-Control"] = f"public, max-age={QR_MAX_AGE}"
+    return response
 
 
 # ================= API HELPERS =================
 
-def _cart_summary_data(session_key):
-    items = CartItem.objects.filter(session_key=session_key)
-    count = sum(i.quantity for i in items)
-    subtotal = sum(
-        Decimal(i.product.get_display_price()) * i.quantity
-        for i in items
-    )
+def _cart_summary_data(request):
+    cart = get_cart(request)
 
     html = render_to_string(
         'shop/_cart_items_fragment.html',
-        {'items': items}
+        {'items': cart.items}
     )
 
     return {
-        'count': count,
-        'subtotal': subtotal,
+        'count': cart.count,
+        'subtotal': cart.subtotal,
         'itemsHtml': html
     }
 
 
 def api_cart_summary(request):
-    data = _cart_summary_data(request.session.session_key or '')
+    data = _cart_summary_data(request)
     return JsonResponse({
         'count': data['count'],
         'subtotal': str(data['subtotal']),
@@ -473,7 +439,6 @@ def api_cart_summary(request):
 
 @require_POST
 def api_cart_add(request):
-    session_key = _get_session_key(request)
     product = get_object_or_404(
         Product,
         id=request.POST.get('product_id'),
@@ -483,33 +448,142 @@ def api_cart_add(request):
      
     size = request.POST.get("size")
 
-    item, created = CartItem.objects.get_or_create(
-    session_key=session_key,
-    product=product,
-    size=size
+    get_cart(request).add(product, qty, size)
+
+    return JsonResponse({
+        'ok': True,
+        **_cart_summary_data(request)
+    })
+
+
+@require_POST
+def api_cart_update(request):
+    # Apply every qty_<item id> change from the cart page in one request
+    try:
+        quantities = parse_quantities(request.POST)
+    except ValidationError as e:
+        return JsonResponse({'ok': False, 'errors': e.messages}, status=400)
+
+    cart = get_cart(request)
+    updated, removed = cart.update_quantities(quantities)
+
+    return JsonResponse({
+        'ok': True,
+        'updated': updated,
+        'removed': removed,
+        'lines': {item.id: str(item.line_total) for item in cart.items},
+        **_cart_summary_data(request)
+    })
+
+
+def api_products(request):
+    # Infinite-scroll fragment: next page of product cards for the grid
+    category = None
+    category_slug = request.GET.get('category')
+    if category_slug:
+        category = _get_category_or_404(category_slug)
+    offers = request.GET.get('offers') == '1'
+
+    products = _catalog_page(request, category=category, offers=offers)
+    _, next_fragment_url = _next_page_urls(request, products)
+
+    html = render_to_string(
+        'shop/_product_cards.html',
+        {'products': products},
+        request=request
     )
 
-    
-    item.quantity = item.quantity + qty if not created else qty
-    item.save()
+    return JsonResponse({
+        'html': html,
+        'next': next_fragment_url,
+    })
+
+
+def product_quick(request, slug):
+    html = quick_view.fragments([slug]).get(slug)
+    if html is None:
+        raise Http404("Product not found")
+    return HttpResponse(quick_view.personalize(html, request))
+
+
+def api_quick_view(request):
+    # Batch prefetch for the grid: ?slugs=a,b,c -> {"fragments": {slug: html}}
+    slugs = [s for s in request.GET.get('slugs', '').split(',') if s]
+    fragments = quick_view.fragments(slugs)
+
+    return JsonResponse({
+        'fragments': {
+            slug: quick_view.personalize(html, request)
+            for slug, html in fragments.items()
+        },
+    })
+
+
+# ================= WISHLIST =================
+
+def wishlist_view(request):
+    return render(request, 'shop/wishlist.html', {
+        'products': [item.product for item in wishlist.items(request)],
+    })
+
+
+def api_wishlist(request):
+    return JsonResponse({'ids': sorted(wishlist.wishlist_ids(request))})
+
+
+def _wishlist_product(request):
+    try:
+        product_id = int(request.POST.get('product_id', ''))
+    except ValueError:
+        raise Http404("Product not found")
+    return get_object_or_404(Product, id=product_id)
 
+
+@require_POST
+def api_wishlist_add(request):
+    product = _wishlist_product(request)
+    wishlist.add(request, product)
     return JsonResponse({
         'ok': True,
-        **_cart_summary_data(session_key)
+        'wishlisted': True,
+        'count': len(wishlist.wishlist_ids(request)),
     })
 
 
-def api_categories(request):
+@require_POST
+def api_wishlist_remove(request):
+    product = _wishlist_product(request)
+    wishlist.remove(request, product.id)
     return JsonResponse({
-        "categories": [
-            {
-                "name": c.name,
-                "url": c.get_absolute_url()
-            }
-            for c in Category.objects.all()
-        ]
+        'ok': True,
+        'wishlisted': False,
+        'count': len(wishlist.wishlist_ids(request)),
     })
 
+
+def api_categories(request):
+    # Revalidated by the nav JS on every load; 304 while nothing changed
+    etag = f'"categories-{category_cache.version()}"'
+    last_modified = category_cache.last_modified().timestamp()
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = JsonResponse({
+            "categories": [
+                {
+                    "name": c.name,
+                    "url": c.url
+                }
+                for c in category_cache.all_categories()
+            ]
+        })
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = "public, max-age=0, must-revalidate"
+    return response
+
 def login_view(request):
     if request.method == "POST":
         email = request.POST.get("email")
@@ -580,24 +654,21 @@ def user_dashboard(request):
 
 @login_required
 def user_orders(request):
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
-
-    now = timezone.now()
-
-    for order in orders:
-        order.return_days_left = 0
-        order.can_return = False
-
-        if order.order_status == 'COMPLETED':
-            deadline = order.created_at + timedelta(days=7)
+    # Constant query count: one page of orders + one prefetch of items/products
+    orders = pagination.paginate(
+        order_history(request.user),
+        '-created_at',
+        request.GET.get('cursor'),
+        per_page=ORDERS_PER_PAGE
+    )
 
-            if now <= deadline:
-                remaining = (deadline - now).days
-                order.return_days_left = max(remaining, 1)
-                order.can_return = True
+    older_url = None
+    if orders.has_next:
+        older_url = f"{reverse('shop:user_orders')}?cursor={orders.next_cursor}"
 
     return render(request, 'shop/user_orders.html', {
-        'orders': orders
+        'orders': orders,
+        'older_url': older_url,
     })
 
 
@@ -615,9 +686,7 @@ def cancel_order(request, order_id):
         user=request.user
     )
 
-    if order.order_status == 'PENDING':
-        order.order_status = 'CANCELLED'
-        order.save()
+    if order_states.apply_one(order, 'cancel'):
         messages.success(request, "Order cancelled successfully.")
     else:
         messages.error(request, "This order cannot be cancelled.")
@@ -630,9 +699,8 @@ def cancel_order(request, order_id):
 @login_required
 def return_order(request, order_id):
     order = get_object_or_404(
-        Order,
-        id=order_id,
-        user=request.user
+        with_return_window(Order.objects.filter(user=request.user)),
+        id=order_id
     )
 
     if request.method != "POST":
@@ -645,9 +713,7 @@ def return_order(request, order_id):
         return redirect('shop:user_orders')
 
     # ⏱️ 7-day return window
-    return_deadline = order.created_at + timedelta(days=7)
-
-    if timezone.now() > return_deadline:
+    if not order.can_return:
         messages.error(
             request,
             "Return period expired (7 days limit)."
@@ -665,10 +731,9 @@ def return_order(request, order_id):
         messages.error(request, "Please provide a return reason.")
         return redirect('shop:user_orders')
 
-    order.order_status = 'RETURN_REQUESTED'
-    order.return_reason = reason
-    order.refund_status = 'REFUND_PENDING'
-    order.save()
+    if not order_states.apply_one(order, 'request_return', return_reason=reason):
+        messages.error(request, "This order cannot be returned.")
+        return redirect('shop:user_orders')
 
     messages.success(
         request,
@@ -679,9 +744,8 @@ def return_order(request, order_id):
 @login_required
 def exchange_order(request, order_id):
     order = get_object_or_404(
-        Order,
-        id=order_id,
-        user=request.user
+        with_return_window(Order.objects.filter(user=request.user)),
+        id=order_id
     )
 
     if request.method != "POST":
@@ -693,8 +757,7 @@ def exchange_order(request, order_id):
         return redirect('shop:user_orders')
 
     # ⏱️ 7-day exchange window
-    deadline = order.created_at + timedelta(days=7)
-    if timezone.now() > deadline:
+    if not order.can_return:
         messages.error(request, "Exchange period expired (7 days).")
         return redirect('shop:user_orders')
 
@@ -710,10 +773,14 @@ def exchange_order(request, order_id):
         messages.error(request, "All fields are required.")
         return redirect('shop:user_orders')
 
-    order.order_status = 'EXCHANGE_REQUESTED'
-    order.exchange_reason = reason
-    order.exchange_product = new_product
-    order.save()
+    if not order_states.apply_one(
+        order,
+        'request_exchange',
+        exchange_reason=reason,
+        exchange_product=new_product
+    ):
+        messages.error(request, "Exchange allowed only for delivered orders.")
+        return redirect('shop:user_orders')
 
     messages.success(request, "Exchange request submitted successfully.")
     return redirect('shop:user_orders')
@@ -726,7 +793,8 @@ def delete_comment(request, comment_id):
         user=request.user   # 🔒 only owner can delete
     )
     product_slug = comment.product.slug
-    comment.delete()
+    with transaction.atomic():
+        comment.delete()
     return redirect("shop:product_detail", slug=product_slug)
 
 
@@ -749,23 +817,11 @@ def buy_now(request, product_id):
 @require_POST
 @login_required(login_url="shop:login")
 def add_to_cart(request, product_id):
-    session_key = _get_session_key(request)
     product = get_object_or_404(Product, id=product_id, available=True)
 
     qty = int(request.POST.get("quantity", 1))
 
-    item, created = CartItem.objects.get_or_create(
-        session_key=session_key,
-        product=product,
-        size=None
-    )
-
-    if created:
-        item.quantity = qty
-    else:
-        item.quantity += qty
-
-    item.save()
+    get_cart(request).add(product, qty)
     return redirect("shop:cart")
 
 def about_page(request):
@@ -0,0 +1,85 @@
+# shop/wishlist.py
+#
+# Wishlist service. The owner is the logged-in user, or the session for
+# anonymous visitors. `wishlist_ids(request)` returns the owner's
+# wishlisted product ids as a set, loaded at most once per request and
+# kept in the Django cache between requests, so product grids mark hearts
+# with `product.id in wishlist_ids` and no per-card queries. Writes (and
+# Wishlist signals, for admin edits) invalidate the cached set.
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Wishlist
+
+
+CACHE_TIMEOUT = getattr(settings, "SHOP_WISHLIST_CACHE_TIMEOUT", 60 * 60 * 24)
+
+
+def _owner(request, create=False):
+    # (user_id, session_key), or None when there is no owner yet
+    if request.user.is_authenticated:
+        return request.user.id, ""
+    if not request.session.session_key:
+        if not create:
+            return None
+        request.session.create()
+    return None, request.session.session_key
+
+
+def _cache_key(user_id, session_key):
+    if user_id:
+        return f"shop:wishlist:user:{user_id}"
+    return f"shop:wishlist:session:{session_key}"
+
+
+def _queryset(user_id, session_key):
+    if user_id:
+        return Wishlist.objects.filter(user_id=user_id)
+    return Wishlist.objects.filter(user__isnull=True, session_key=session_key)
+
+
+def wishlist_ids(request):
+    ids = getattr(request, "_shop_wishlist_ids", None)
+    if ids is None:
+        owner = _owner(request)
+        if owner is None:
+            ids = set()
+        else:
+            key = _cache_key(*owner)
+            ids = cache.get(key)
+            if ids is None:
+                ids = set(_queryset(*owner).values_list("product_id", flat=True))
+                cache.set(key, ids, CACHE_TIMEOUT)
+        request._shop_wishlist_ids = ids
+    return ids
+
+
+def items(request):
+    owner = _owner(request)
+    if owner is None:
+        return []
+    return list(
+        _queryset(*owner)
+        .select_related("product", "product__category")
+        .order_by("-added_at", "-id")
+    )
+
+
+def add(request, product):
+    user_id, session_key = _owner(request, create=True)
+    Wishlist.objects.get_or_create(user_id=user_id, session_key=session_key, product=product)
+    invalidate(user_id, session_key, request)
+
+
+def remove(request, product_id):
+    owner = _owner(request)
+    if owner is not None:
+        _queryset(*owner).filter(product_id=product_id).delete()
+        invalidate(*owner, request=request)
+
+
+def invalidate(user_id, session_key, request=None):
+    cache.delete(_cache_key(user_id, session_key))
+    if request is not None:
+        request._shop_wishlist_ids = None